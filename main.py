@@ -1,24 +1,135 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import re
+import os
+import sys
+import argparse
+import json
+import zlib
+import sqlite3
+import asyncio
+import functools
 import requests
+from requests.adapters import HTTPAdapter
 import time
-from urllib.parse import quote, quote_plus
-from datetime import datetime, timedelta
+import random
+import threading
+import heapq
+import itertools
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote, quote_plus, urlsplit, urlencode
+from datetime import datetime, timedelta, timezone
 from bs4 import BeautifulSoup
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from statistics import mean, stdev
+from offline import (
+    DATA_DIR, PAGEVIEW_STORE_DIR, SITELINK_INDEX_PATH, QID_BITSET_DIR,
+    compact_sitelinks, partition_path, partition_complete, PageviewPartition, ingest_pageview_dumps,
+    SitelinkIndex, ingest_sitelink_dump, QidBitsets, build_qid_bitsets,
+)
+from viewstats import STAT_WINDOWS, compute_view_stats_frame, ViewStatsTracker
 
 st.set_page_config(page_title="Wikipedia Relevanz-Radar", layout="wide")
 
 # ---------- CONFIG ----------
 SUPPORTED_LANGS = ["en", "de", "fr", "es", "ar", "tr", "it", "ru", "pl"]
 DE_ESTIMATE_FACTOR = 0.12
+# share of days an article must appear in the daily top lists to take its stats from them
+TOP_HISTORY_MIN_COVERAGE = 0.8
+
+# EWMA spike detection over the daily top lists of all SUPPORTED_LANGS
+SPIKE_ALPHA = 0.25
+SPIKE_Z_THRESHOLD = 3.0
+SPIKE_MIN_RATIO = 2.0
+SPIKE_MIN_REL_STD = 0.25
+SPIKE_WARMUP_DAYS = 14
+SPIKE_PRUNE_DAYS = 30
 HEADERS = {"User-Agent": "WikipediaGapFinder/0.6 (daniel.sigge@web.de)"}
+# optional OAuth 2 owner-only token; accounts with apihighlimits get 10x larger batches
+API_TOKEN = os.environ.get("WIKIRADAR_API_TOKEN")
+if API_TOKEN:
+    HEADERS["Authorization"] = f"Bearer {API_TOKEN}"
 REQUEST_TIMEOUT = 10
+MAX_WORKERS = 4
+
+# max. parallel requests per host in the async fetch engine
+HOST_CONCURRENCY = {
+    "wikimedia.org": 10,
+    "www.wikidata.org": 4,
+}
+DEFAULT_HOST_CONCURRENCY = 6
+HTTP_POOL_SIZE = max(MAX_WORKERS, DEFAULT_HOST_CONCURRENCY, *HOST_CONCURRENCY.values())
+
+# shared request budget per host: (requests per second, burst)
+HOST_RATE_LIMITS = {
+    "wikimedia.org": (50, 20),
+    "www.wikidata.org": (10, 5),
+}
+DEFAULT_RATE_LIMIT = (20, 10)
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+MAX_BACKOFF = 30
+# consecutive failed attempts before a host is considered down, and how long it stays open
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 60
+RETRY_LATER_MARK = "⏳"
+# failed metadata chunks are retried in the background: base pause, attempts, split after n failures
+LOOKUP_RETRY_PAUSE = 5
+LOOKUP_RETRY_ATTEMPTS = 6
+LOOKUP_RETRY_SPLIT_AFTER = 2
+# seconds between table refreshes while background lookups are pending
+RETRY_REFRESH_SECONDS = 3
+
+# Prometheus text export on http://<host>:<port>/metrics; 0 disables the endpoint
+METRICS_PORT = int(os.environ.get("WIKIRADAR_METRICS_PORT", "9108"))
+# loopback only by default; set to 0.0.0.0 to let a scraper on another host reach it
+METRICS_HOST = os.environ.get("WIKIRADAR_METRICS_HOST", "127.0.0.1")
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# same depth as the REST top endpoint
+DUMP_TOP_LIMIT = 1000
+# per-article daily views with the covered day range, extended by delta fetches
+ARTICLE_VIEWS_PATH = os.path.join(DATA_DIR, "article_views.sqlite3")
+# wikis that get a bitset next to the sitelink index
+QID_BITSET_LANGS = SUPPORTED_LANGS
+
+# the default lives in the app directory; on Cloud Run (the .replit deployment target) that filesystem is
+# in-memory and per instance, so the cache only survives restarts if WIKIRADAR_CACHE_DIR (and
+# WIKIRADAR_DATA_DIR for the stores above) point to a mounted volume
+CACHE_DIR = os.environ.get("WIKIRADAR_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+HTTP_CACHE_PATH = os.path.join(CACHE_DIR, "http_cache.sqlite3")
+# first matching pattern wins; past top-list days are detected separately and never expire.
+# Per-article ranges bypass this cache, the article view store keeps them instead.
+HTTP_CACHE_TTLS = [
+    (r"/metrics/pageviews/top/", 6 * 3600),
+    (r"/api/rest_v1/page/summary/", 86400),
+    (r"/wiki/Wikipedia:WikiProjekt_Frauen/", 3600),
+    (r"/w/api\.php", 86400),
+]
+DEFAULT_HTTP_CACHE_TTL = 3600
+HTTP_CACHE_KEEP_STALE = 7 * 86400
 
 MW_TITLES_PER_REQUEST = 50
 WD_IDS_PER_REQUEST = 50
+# titles/ids per request with the apihighlimits right
+API_HIGH_LIMIT = 500
+# api.php queries with a longer encoded URL are sent as POST
+MAX_GET_URL_LENGTH = 2000
+# answers to an oversized request; the batch is split and sent in halves
+PAYLOAD_TOO_LARGE_CODES = (413, 414)
+MW_MAX_CONTINUATIONS = 20
+# days of daily views delivered by prop=pageviews; longer windows come from the REST API
+MW_PAGEVIEW_DAYS = 30
+MW_PAGEVIEW_MAX_DAYS = 60
+# prop=extracts with exintro is limited to 20 titles per request
+MW_EXTRACTS_PER_REQUEST = 20
+SUMMARY_CHARS = 180
+SUMMARY_TTL = 86400
+# Wikidata sitelinks per QID, reduced to {language: title} of the Wikipedia editions
+SITELINK_TTL = 86400
+# target wikis that get an "Exists in XX" column next to DE
+GAP_LANGS = ["de", "fr", "it"]
 
 
 # ---------- HELPERS ----------
@@ -47,24 +158,6 @@ def views_format(x):
         return str(x)
 
 
-def safe_get(url, params=None, timeout=REQUEST_TIMEOUT, retries=3, pause=0.6):
-    for attempt in range(retries):
-        try:
-            r = requests.get(url, params=params, headers=HEADERS, timeout=timeout)
-            if r.status_code == 200:
-                return r
-            if r.status_code in (429, 500, 502, 503, 504):
-                time.sleep(pause * (attempt + 1))
-                continue
-            return None
-        except Exception:
-            if attempt < retries - 1:
-                time.sleep(pause * (attempt + 1))
-            else:
-                return None
-    return None
-
-
 def prepare_dataframe_for_sorting(df):
     for col in ["Views (30d)", "Views (Yesterday)", "Estimated DE Views", "CV"]:
         if col in df.columns:
@@ -82,6 +175,8 @@ def reorder_columns(df, context="default"):
             "Views (Yesterday)",
             "Estimated DE Views",
             "Exists in DE",
+            "Exists in FR",
+            "Exists in IT",
             "German Title",
             "Summary",
         ],
@@ -103,18 +198,927 @@ def reorder_columns(df, context="default"):
             "Viralität",
             "Views (Yesterday)",
         ],
+        "multi": [
+            "Title",
+            "Sprachen",
+            "Views (30d)",
+            "Views (Yesterday)",
+            "Estimated DE Views",
+            "Exists in DE",
+            "Exists in FR",
+            "Exists in IT",
+            "German Title",
+            "QID",
+        ],
     }
 
     order = preferred_orders.get(context, preferred_orders["default"])
     existing = [col for col in order if col in df.columns]
-    remaining = [col for col in df.columns if col not in existing]
+    # columns starting with "_" are bookkeeping and never displayed
+    remaining = [col for col in df.columns if col not in existing and not col.startswith("_")]
     return df[existing + remaining]
 
 
 def filter_missing_in_de(rows, only_missing=True):
     if not only_missing:
         return rows
-    return [row for row in rows if row.get("Exists in DE") == "❌"]
+    # rows still waiting for a background lookup stay until they are resolved
+    return [row for row in rows if row.get("Exists in DE") in ("❌", RETRY_LATER_MARK)]
+
+
+# ---------- METRICS ----------
+def endpoint_of(url, params=None):
+    parts = urlsplit(url)
+    path = parts.path
+    if "/metrics/pageviews/per-article/" in path:
+        return "pageviews:per-article"
+    if "/metrics/pageviews/top/" in path:
+        return "pageviews:top"
+    if "/api/rest_v1/" in path:
+        return "rest:" + path.split("/api/rest_v1/", 1)[1].split("/", 2)[1]
+    if path.endswith("/w/api.php"):
+        params = params or {}
+        site = "wikidata" if parts.hostname == "www.wikidata.org" else "mediawiki"
+        detail = params.get("prop") or params.get("list") or params.get("generator") or ""
+        return ":".join(p for p in (site, params.get("action", ""), detail) if p)
+    return "html"
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+    def cumulative(self):
+        running = 0
+        for bound, n in zip(LATENCY_BUCKETS, self.buckets):
+            running += n
+            yield bound, running
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = defaultdict(LatencyHistogram)
+        self.status = defaultdict(int)
+        self.retries = defaultdict(int)
+        self.bytes = defaultdict(int)
+        self.cache = defaultdict(int)
+        self.stages = defaultdict(LatencyHistogram)
+
+    def record_request(self, endpoint, status, seconds, size):
+        with self.lock:
+            if seconds is not None:
+                self.latency[endpoint].observe(seconds)
+            self.status[(endpoint, str(status))] += 1
+            self.bytes[endpoint] += size
+
+    def record_retry(self, endpoint):
+        with self.lock:
+            self.retries[endpoint] += 1
+
+    def record_cache(self, endpoint, result):
+        with self.lock:
+            self.cache[(endpoint, result)] += 1
+
+    def record_stage(self, stage, seconds):
+        with self.lock:
+            self.stages[stage].observe(seconds)
+
+    def endpoint_summary(self):
+        with self.lock:
+            endpoints = set(self.latency) | {e for e, _ in self.cache}
+            rows = {}
+            for endpoint in sorted(endpoints):
+                hist = self.latency.get(endpoint)
+                hits = sum(n for (e, result), n in self.cache.items() if e == endpoint and result != "miss")
+                lookups = sum(n for (e, _), n in self.cache.items() if e == endpoint)
+                rows[endpoint] = {
+                    "Anfragen": hist.count if hist else 0,
+                    "Ø ms": round(hist.total / hist.count * 1000) if hist and hist.count else None,
+                    "Retries": self.retries.get(endpoint, 0),
+                    "KB": round(self.bytes.get(endpoint, 0) / 1024),
+                    "Cache-Hits %": round(hits / lookups * 100) if lookups else None,
+                }
+            return rows
+
+    def stage_summary(self):
+        with self.lock:
+            return {
+                stage: {
+                    "Aufrufe": hist.count,
+                    "Gesamt s": round(hist.total, 2),
+                    "Ø s": round(hist.total / hist.count, 2) if hist.count else None,
+                }
+                for stage, hist in sorted(self.stages.items())
+            }
+
+    def prometheus_text(self):
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name, label, histograms):
+            for key, hist in sorted(histograms.items()):
+                for bound, n in hist.cumulative():
+                    lines.append(f'{name}_bucket{{{label}="{prom_escape(key)}",le="{bound}"}} {n}')
+                lines.append(f'{name}_bucket{{{label}="{prom_escape(key)}",le="+Inf"}} {hist.count}')
+                lines.append(f'{name}_sum{{{label}="{prom_escape(key)}"}} {hist.total:.6f}')
+                lines.append(f'{name}_count{{{label}="{prom_escape(key)}"}} {hist.count}')
+
+        with self.lock:
+            header("wikiradar_http_request_duration_seconds", "histogram", "Latency of outbound HTTP attempts.")
+            histogram("wikiradar_http_request_duration_seconds", "endpoint", self.latency)
+            header("wikiradar_http_requests_total", "counter", "Outbound HTTP attempts by status code.")
+            for (endpoint, status), n in sorted(self.status.items()):
+                lines.append(f'wikiradar_http_requests_total{{endpoint="{prom_escape(endpoint)}",status="{status}"}} {n}')
+            header("wikiradar_http_retries_total", "counter", "Retried HTTP attempts.")
+            for endpoint, n in sorted(self.retries.items()):
+                lines.append(f'wikiradar_http_retries_total{{endpoint="{prom_escape(endpoint)}"}} {n}')
+            header("wikiradar_http_response_bytes_total", "counter", "Response body bytes received.")
+            for endpoint, n in sorted(self.bytes.items()):
+                lines.append(f'wikiradar_http_response_bytes_total{{endpoint="{prom_escape(endpoint)}"}} {n}')
+            header("wikiradar_http_cache_lookups_total", "counter", "Response cache lookups by result.")
+            for (endpoint, result), n in sorted(self.cache.items()):
+                lines.append(
+                    f'wikiradar_http_cache_lookups_total{{endpoint="{prom_escape(endpoint)}",result="{result}"}} {n}'
+                )
+            header("wikiradar_stage_duration_seconds", "histogram", "Duration of fetch and processing stages.")
+            histogram("wikiradar_stage_duration_seconds", "stage", self.stages)
+
+        header("wikiradar_breaker_open", "gauge", "1 while a host's circuit breaker is not closed.")
+        for host, stats in sorted(get_breaker_stats().items()):
+            lines.append(f'wikiradar_breaker_open{{host="{prom_escape(host)}"}} {int(stats["Status"] != "closed")}')
+        header("wikiradar_pool_connections_total", "counter", "New connections opened per host pool.")
+        for host, stats in sorted(get_pool_stats().items()):
+            lines.append(f'wikiradar_pool_connections_total{{host="{prom_escape(host)}"}} {stats["Pool-Misses"]}')
+        header("wikiradar_singleflight_coalesced_total", "counter", "Requests that reused an in-flight response.")
+        lines.append(f"wikiradar_singleflight_coalesced_total {get_single_flight().coalesced}")
+        return "\n".join(lines) + "\n"
+
+
+def prom_escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+@st.cache_resource
+def get_request_metrics():
+    return RequestMetrics()
+
+
+def timed_stage(stage):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                get_request_metrics().record_stage(stage, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = get_request_metrics().prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@st.cache_resource
+def start_metrics_server(host=METRICS_HOST, port=METRICS_PORT):
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+    except OSError:
+        return None
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics").start()
+    return server
+
+
+# ---------- HTTP ----------
+HTTP_POOLS = {
+    "wikimedia": "https://wikimedia.org/",
+    "wikidata": "https://www.wikidata.org/",
+    "wikipedia": "https://",
+}
+
+
+@st.cache_resource
+def get_http_session():
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    for name, prefix in HTTP_POOLS.items():
+        # one urllib3 pool per host; the wikipedia adapter serves all language subdomains
+        adapter = HTTPAdapter(
+            pool_connections=len(SUPPORTED_LANGS) + 2 if name == "wikipedia" else 1,
+            pool_maxsize=HTTP_POOL_SIZE,
+        )
+        session.mount(prefix, adapter)
+    return session
+
+
+def get_pool_stats():
+    session = get_http_session()
+    stats = {}
+    for prefix in HTTP_POOLS.values():
+        pools = session.adapters[prefix].poolmanager.pools
+        for key in pools.keys():
+            try:
+                pool = pools[key]
+            except KeyError:
+                continue
+            hits = max(pool.num_requests - pool.num_connections, 0)
+            stats[pool.host] = {
+                "Requests": pool.num_requests,
+                "Pool-Hits": hits,
+                "Pool-Misses": pool.num_connections,
+            }
+    return stats
+
+
+def host_of(url):
+    return urlsplit(url).hostname or ""
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now >= self.updated:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                else:
+                    # host is paused (Retry-After / 429)
+                    wait = self.updated - now
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        with self.lock:
+            self.tokens = 0
+            self.updated = max(self.updated, time.monotonic() + seconds)
+
+
+@st.cache_resource
+def get_rate_limiters():
+    return {}, threading.Lock()
+
+
+def get_rate_limiter(host):
+    limiters, lock = get_rate_limiters()
+    with lock:
+        if host not in limiters:
+            rate, burst = HOST_RATE_LIMITS.get(host, DEFAULT_RATE_LIMIT)
+            limiters[host] = TokenBucket(rate, burst)
+        return limiters[host]
+
+
+@st.cache_resource
+def get_host_slots():
+    return {}, threading.Lock()
+
+
+def get_host_slot(host):
+    # process-wide cap on in-flight requests per host, shared by all sessions, threads and nested fetches
+    slots, lock = get_host_slots()
+    with lock:
+        if host not in slots:
+            slots[host] = threading.BoundedSemaphore(HOST_CONCURRENCY.get(host, DEFAULT_HOST_CONCURRENCY))
+        return slots[host]
+
+
+def parse_retry_after(value):
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - datetime.now(retry_at.tzinfo)).total_seconds(), 0)
+
+
+def backoff_delay(attempt, pause):
+    delay = min(MAX_BACKOFF, pause * 2 ** attempt)
+    return random.uniform(delay / 2, delay)
+
+
+class CircuitBreaker:
+    def __init__(self, threshold, reset_timeout):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0
+        self.probe_running = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = "half-open"
+            # half-open: let a single probe request through
+            if self.probe_running:
+                return False
+            self.probe_running = True
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.state = "closed"
+            self.failures = 0
+            self.probe_running = False
+
+    def record_throttled(self):
+        # 429: the host is up, it only asks us to slow down; neither a failure nor a recovery
+        with self.lock:
+            self.probe_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.probe_running = False
+            if self.state == "half-open" or self.failures >= self.threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+@st.cache_resource
+def get_circuit_breakers():
+    return {}, threading.Lock()
+
+
+def get_circuit_breaker(host):
+    breakers, lock = get_circuit_breakers()
+    with lock:
+        if host not in breakers:
+            breakers[host] = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
+        return breakers[host]
+
+
+def get_breaker_stats():
+    breakers, lock = get_circuit_breakers()
+    with lock:
+        items = list(breakers.items())
+    return {host: {"Status": b.state, "Fehler in Folge": b.failures} for host, b in items}
+
+
+def degraded_hosts():
+    return {host for host, stats in get_breaker_stats().items() if stats["Status"] != "closed"}
+
+
+def get_with_retries(url, params=None, timeout=REQUEST_TIMEOUT, retries=3, pause=0.6, headers=None, method="GET"):
+    session = get_http_session()
+    host = host_of(url)
+    limiter = get_rate_limiter(host)
+    breaker = get_circuit_breaker(host)
+    metrics = get_request_metrics()
+    endpoint = endpoint_of(url, params)
+    for attempt in range(retries):
+        last_attempt = attempt == retries - 1
+        if not breaker.allow():
+            metrics.record_request(endpoint, "circuit-open", None, 0)
+            return None
+        if attempt:
+            metrics.record_retry(endpoint)
+        limiter.acquire()
+        started = time.perf_counter()
+        try:
+            # only the request itself holds a slot, so nested jobs waiting on each other cannot deadlock
+            with get_host_slot(host):
+                if method == "POST":
+                    r = session.post(url, data=params, headers=headers, timeout=timeout)
+                else:
+                    r = session.get(url, params=params, headers=headers, timeout=timeout)
+        except Exception:
+            metrics.record_request(endpoint, "error", time.perf_counter() - started, 0)
+            breaker.record_failure()
+            if last_attempt:
+                return None
+            time.sleep(backoff_delay(attempt, pause))
+            continue
+        metrics.record_request(endpoint, r.status_code, time.perf_counter() - started, len(r.content))
+
+        if r.status_code not in RETRY_STATUS_CODES:
+            breaker.record_success()
+            # client errors come back as (falsy) responses so callers can tell e.g. 404 from an outage
+            return r
+        if r.status_code == 429:
+            # throttling is handled by the limiter pause below and must not open the breaker
+            breaker.record_throttled()
+        else:
+            breaker.record_failure()
+        if last_attempt:
+            return None
+
+        retry_after = parse_retry_after(r.headers.get("Retry-After"))
+        if retry_after is not None or r.status_code == 429:
+            # throttling concerns the whole host, so every worker waits on the shared bucket
+            delay = retry_after if retry_after is not None else backoff_delay(attempt, pause)
+            limiter.pause(min(delay, MAX_BACKOFF))
+        else:
+            time.sleep(backoff_delay(attempt, pause))
+    return None
+
+
+class SingleFlight:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, func):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = {"done": threading.Event(), "result": None}
+                self.calls[key] = call
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call["done"].wait()
+            return call["result"]
+
+        try:
+            call["result"] = func()
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call["done"].set()
+        return call["result"]
+
+    def stats(self):
+        with self.lock:
+            return {
+                "Ausgeführt": self.leaders,
+                "Zusammengelegt": self.coalesced,
+                "Laufend": len(self.calls),
+            }
+
+
+@st.cache_resource
+def get_single_flight():
+    return SingleFlight()
+
+
+def fetch_and_cache(url, params, key, entry, timeout, retries, pause, method="GET"):
+    cache = get_response_cache()
+    metrics = get_request_metrics()
+    endpoint = endpoint_of(url, params)
+    r = get_with_retries(
+        url,
+        params=params,
+        timeout=timeout,
+        retries=retries,
+        pause=pause,
+        headers=revalidation_headers(entry),
+        method=method,
+    )
+    if r is None:
+        # serve stale data rather than nothing while the API is unavailable
+        if not entry:
+            metrics.record_cache(endpoint, "miss")
+            return None
+        metrics.record_cache(endpoint, "stale")
+        return cached_response(entry)
+
+    ttl = cache_ttl(url)
+    if r.status_code == 304:
+        if not entry:
+            metrics.record_cache(endpoint, "miss")
+            return None
+        metrics.record_cache(endpoint, "revalidated")
+        cache.touch(key, ttl)
+        return cached_response(entry)
+
+    metrics.record_cache(endpoint, "miss")
+    if r.status_code == 200:
+        cache.put(key, url, r, ttl)
+    return r
+
+
+def safe_get(url, params=None, timeout=REQUEST_TIMEOUT, retries=3, pause=0.6, use_cache=True):
+    key = cache_key(url, params)
+    # long read-only api.php queries go as POST; they are cached under the same key as a GET
+    method = "POST" if len(key) > MAX_GET_URL_LENGTH and urlsplit(url).path.endswith("/api.php") else "GET"
+    # identical requests already in flight share one response
+    single_flight = get_single_flight()
+    if not use_cache:
+        return single_flight.do(
+            ("live", key),
+            lambda: get_with_retries(
+                url, params=params, timeout=timeout, retries=retries, pause=pause, method=method
+            ),
+        )
+
+    entry = get_response_cache().get(key)
+    if entry and entry["fresh"]:
+        get_request_metrics().record_cache(endpoint_of(url, params), "hit")
+        return cached_response(entry)
+    return single_flight.do(
+        ("cached", key),
+        lambda: fetch_and_cache(url, params, key, entry, timeout, retries, pause, method),
+    )
+
+
+# ---------- HTTP CACHE ----------
+TOP_DAY_RE = re.compile(r"/metrics/pageviews/top/[^/]+/[^/]+/(\d{4})/(\d{2})/(\d{2})$")
+TOP_MONTH_RE = re.compile(r"/metrics/pageviews/top/[^/]+/[^/]+/(\d{4})/(\d{2})/all-days$")
+
+
+def cache_key(url, params=None):
+    if not params:
+        return url
+    return url + "?" + urlencode(sorted((k, str(v)) for k, v in params.items()))
+
+
+def is_immutable_url(url):
+    today = datetime.now(timezone.utc).strftime("%Y%m%d")
+    match = TOP_DAY_RE.search(url)
+    if match:
+        # a published top list for a finished day never changes
+        return "".join(match.groups()) < today
+    match = TOP_MONTH_RE.search(url)
+    if match:
+        return "".join(match.groups()) < today[:6]
+    return False
+
+
+def cache_ttl(url):
+    if is_immutable_url(url):
+        return None
+    for pattern, ttl in HTTP_CACHE_TTLS:
+        if re.search(pattern, url):
+            return ttl
+    return DEFAULT_HTTP_CACHE_TTL
+
+
+def revalidation_headers(entry):
+    if not entry:
+        return None
+    headers = {}
+    if entry["etag"]:
+        headers["If-None-Match"] = entry["etag"]
+    if entry["last_modified"]:
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers or None
+
+
+def cached_response(entry):
+    r = requests.Response()
+    r.status_code = 200
+    r.url = entry["url"]
+    r._content = entry["body"]
+    r.headers = requests.structures.CaseInsensitiveDict(entry["headers"])
+    r.encoding = requests.utils.get_encoding_from_headers(r.headers)
+    return r
+
+
+class ResponseCache:
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, url TEXT, body BLOB, headers TEXT, "
+                "etag TEXT, last_modified TEXT, stored_at REAL, expires_at REAL)"
+            )
+
+    def get(self, key):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT url, body, headers, etag, last_modified, expires_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if not row:
+            return None
+        url, body, headers, etag, last_modified, expires_at = row
+        return {
+            "url": url,
+            "body": zlib.decompress(body),
+            "headers": json.loads(headers),
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh": expires_at is None or expires_at > time.time(),
+        }
+
+    def put(self, key, url, response, ttl):
+        now = time.time()
+        headers = {
+            k: v for k, v in response.headers.items()
+            if k.lower() in ("content-type", "etag", "last-modified")
+        }
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    url,
+                    zlib.compress(response.content),
+                    json.dumps(headers),
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    now,
+                    None if ttl is None else now + ttl,
+                ),
+            )
+
+    def touch(self, key, ttl):
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE responses SET stored_at = ?, expires_at = ? WHERE key = ?",
+                (now, None if ttl is None else now + ttl, key),
+            )
+
+    def prune(self, keep_stale=HTTP_CACHE_KEEP_STALE):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at < ?",
+                (time.time() - keep_stale,),
+            )
+
+
+@st.cache_resource
+def get_response_cache():
+    cache = ResponseCache(HTTP_CACHE_PATH)
+    cache.prune()
+    return cache
+
+
+# ---------- ASYNC FETCH ENGINE ----------
+def wiki_host(lang):
+    return f"{lang}.wikipedia.org"
+
+
+@st.cache_resource
+def get_fetch_executor():
+    return ThreadPoolExecutor(
+        max_workers=sum(HOST_CONCURRENCY.values()) + DEFAULT_HOST_CONCURRENCY,
+        thread_name_prefix="fetch",
+    )
+
+
+async def _gather_jobs(jobs, executor, follow=None):
+    loop = asyncio.get_running_loop()
+    semaphores = {}
+    results = {}
+
+    async def run(key, host, func, args):
+        # per-call limit keeps one call from taking the whole pool; the hard per-host cap on
+        # requests in flight is get_host_slot in get_with_retries
+        if host not in semaphores:
+            semaphores[host] = asyncio.Semaphore(HOST_CONCURRENCY.get(host, DEFAULT_HOST_CONCURRENCY))
+        async with semaphores[host]:
+            try:
+                result = await loop.run_in_executor(executor, functools.partial(func, *args))
+            except Exception:
+                result = None
+        results[key] = result
+        if follow is not None:
+            # follow-up jobs start as soon as their input is there
+            more = follow(key, result) or {}
+            await asyncio.gather(*(run(k, *job) for k, job in more.items()))
+
+    await asyncio.gather(*(run(key, *job) for key, job in jobs.items()))
+    return results
+
+
+def fetch_concurrently(jobs, follow=None):
+    # jobs: {key: (host, func, args)} -> {key: result}; blocking wrapper for the Streamlit tabs.
+    # follow(key, result) runs on the calling side and may return further jobs to schedule.
+    if not jobs:
+        return {}
+    if threading.current_thread().name.startswith("fetch"):
+        # nested call from a pool worker: blocking on the shared pool could starve it
+        max_workers = min(len(jobs), sum(HOST_CONCURRENCY.values()) + DEFAULT_HOST_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch-nested") as executor:
+            return asyncio.run(_gather_jobs(jobs, executor, follow))
+    return asyncio.run(_gather_jobs(jobs, get_fetch_executor(), follow))
+
+
+# ---------- OFFLINE DATA ----------
+# dump parsing and the on-disk formats live in offline.py; these keep the opened files per process
+@st.cache_resource(max_entries=64)
+def load_pageview_partition(path, mtime):
+    return PageviewPartition.load(path)
+
+
+def get_day_partition(lang, day):
+    # days that are only partly ingested (some hourly files missing) count as absent
+    path = partition_path(lang, day)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    partition = load_pageview_partition(path, mtime)
+    return partition if partition.complete else None
+
+
+def get_stored_daily_views(title, lang="en", days=30):
+    # only answers if every day of the window has been ingested
+    today = datetime.today()
+    series = {}
+    for delta in range(days, 0, -1):
+        day = (today - timedelta(days=delta)).strftime("%Y%m%d")
+        partition = get_day_partition(lang, day)
+        if partition is None:
+            return None
+        series[day] = partition.lookup(title)
+    return series
+
+
+@st.cache_resource
+def open_sitelink_index(path):
+    return SitelinkIndex(path)
+
+
+def get_sitelink_index():
+    if not os.path.exists(SITELINK_INDEX_PATH):
+        return None
+    return open_sitelink_index(SITELINK_INDEX_PATH)
+
+
+@st.cache_resource
+def open_qid_bitsets(directory, mtime):
+    return QidBitsets(directory)
+
+
+def get_qid_bitsets():
+    try:
+        mtime = os.path.getmtime(os.path.join(QID_BITSET_DIR, "meta.json"))
+    except OSError:
+        return None
+    return open_qid_bitsets(QID_BITSET_DIR, mtime)
+
+
+# ---------- ARTICLE VIEW STORE ----------
+def shift_day(day, n):
+    return (datetime.strptime(day, "%Y%m%d") + timedelta(days=n)).strftime("%Y%m%d")
+
+
+def view_window(days):
+    # same days as the REST range today-days..today, whose last day is never published yet
+    today = datetime.today()
+    start = (today - timedelta(days=days)).strftime("%Y%m%d")
+    end = (today - timedelta(days=1)).strftime("%Y%m%d")
+    return start, end
+
+
+class ArticleViewStore:
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS daily_views ("
+                "lang TEXT, title TEXT, day TEXT, views INTEGER, "
+                "PRIMARY KEY (lang, title, day)) WITHOUT ROWID"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS coverage ("
+                "lang TEXT, title TEXT, first_day TEXT, last_day TEXT, "
+                "PRIMARY KEY (lang, title)) WITHOUT ROWID"
+            )
+
+    def coverage(self, lang, title):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT first_day, last_day FROM coverage WHERE lang = ? AND title = ?",
+                (lang, title),
+            ).fetchone()
+
+    def missing_ranges(self, lang, title, start, end):
+        covered = self.coverage(lang, title)
+        if not covered:
+            return [(start, end)]
+        first, last = covered
+        ranges = []
+        if start < first:
+            ranges.append((start, min(end, shift_day(first, -1))))
+        if end > last:
+            ranges.append((max(start, shift_day(last, 1)), end))
+        return ranges
+
+    def write(self, lang, title, series, first, last):
+        # days inside [first, last] without an entry had no views
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO daily_views VALUES (?, ?, ?, ?)",
+                [(lang, title, day, views) for day, views in series.items() if first <= day <= last],
+            )
+            covered = self.conn.execute(
+                "SELECT first_day, last_day FROM coverage WHERE lang = ? AND title = ?",
+                (lang, title),
+            ).fetchone()
+            if covered and shift_day(covered[0], -1) <= last and first <= shift_day(covered[1], 1):
+                first, last = min(first, covered[0]), max(last, covered[1])
+            self.conn.execute(
+                "INSERT OR REPLACE INTO coverage VALUES (?, ?, ?, ?)",
+                (lang, title, first, last),
+            )
+
+    def read(self, lang, title, start, end):
+        covered = self.coverage(lang, title)
+        if not covered:
+            return {}
+        first, last = max(start, covered[0]), min(end, covered[1])
+        if first > last:
+            return {}
+        with self.lock:
+            rows = dict(self.conn.execute(
+                "SELECT day, views FROM daily_views WHERE lang = ? AND title = ? AND day BETWEEN ? AND ?",
+                (lang, title, first, last),
+            ).fetchall())
+        series = {}
+        day = first
+        while day <= last:
+            series[day] = rows.get(day, 0)
+            day = shift_day(day, 1)
+        return series
+
+
+@st.cache_resource
+def get_article_view_store():
+    return ArticleViewStore(ARTICLE_VIEWS_PATH)
+
+
+def store_fetched_views(title, lang, series, start, end):
+    # a missing latest day usually means it is not published yet, so it stays uncovered
+    yesterday = (datetime.today() - timedelta(days=1)).strftime("%Y%m%d")
+    if end >= yesterday and end not in series:
+        end = max([d for d in series if d <= end] + [shift_day(yesterday, -1)])
+    if start <= end:
+        get_article_view_store().write(lang, title, series, start, end)
+
+
+def fetch_daily_views_range(title, lang, start, end):
+    # user agents only, the same metric as prop=pageviews and the dumps, since both end up in one store
+    encoded = quote(title, safe="")
+    url = (
+        f"https://wikimedia.org/api/rest_v1/metrics/pageviews/per-article/"
+        f"{lang}.wikipedia/all-access/user/{encoded}/daily/{start}/{end}"
+    )
+    # the article store keeps these days, so the response cache would only duplicate them
+    r = safe_get(url, use_cache=False)
+    if r is not None and r.status_code == 404:
+        # the API answers 404 for ranges in which the article had no views at all
+        return {}
+    if not r:
+        return None
+
+    items = r.json().get("items", [])
+    return {i["timestamp"][:8]: i["views"] for i in items if "views" in i and "timestamp" in i}
 
 
 # ---------- BASIC WIKIPEDIA ----------
@@ -123,6 +1127,7 @@ def normalize_title_fallback(title: str) -> str:
 
 
 @st.cache_data(ttl=86400)
+@timed_stage("normalize_title")
 def normalize_title(title, lang="en"):
     url = f"https://{lang}.wikipedia.org/w/api.php"
     params = {
@@ -142,173 +1147,525 @@ def normalize_title(title, lang="en"):
     return normalize_title_fallback(title)
 
 
-@st.cache_data(ttl=86400)
-def get_pageviews(title, lang="en", days=30):
-    end_date = datetime.today()
-    start_date = end_date - timedelta(days=days)
-    start_str = start_date.strftime("%Y%m%d")
-    end_str = end_date.strftime("%Y%m%d")
-    encoded = quote(title, safe="")
-    url = (
-        f"https://wikimedia.org/api/rest_v1/metrics/pageviews/per-article/"
-        f"{lang}.wikipedia/all-access/all-agents/{encoded}/daily/{start_str}/{end_str}"
-    )
-    r = safe_get(url)
-    if not r:
-        return None
+@timed_stage("get_daily_views")
+def get_daily_views(title, lang="en", days=30):
+    stored = get_stored_daily_views(title, lang=lang, days=days)
+    if stored is not None:
+        return stored
 
-    data = r.json()
-    return sum(item.get("views", 0) for item in data.get("items", []))
+    start, end = view_window(days)
+    store = get_article_view_store()
+    for gap_start, gap_end in store.missing_ranges(lang, title, start, end):
+        series = fetch_daily_views_range(title, lang, gap_start, gap_end)
+        if series is None:
+            return None
+        store_fetched_views(title, lang, series, gap_start, gap_end)
+    return store.read(lang, title, start, end)
+
+
+@st.cache_resource
+def get_view_stats_tracker():
+    return ViewStatsTracker()
+
+
+def tracked_virality(lang, title, series, window=MW_PAGEVIEW_DAYS):
+    # (CV, virality) from the article's running window: repeated scans only push the new days
+    _, _, cv, _, virality = get_view_stats_tracker().update(lang, title, series, window=window)
+    return cv, virality
+
+
+def optional_number(value):
+    return None if pd.isna(value) else value
+
+
+def sum_views(series):
+    if series is None:
+        return None
+    return sum(series.values())
 
 
-@st.cache_data(ttl=86400)
 def get_summary(title, lang="en"):
-    encoded = quote(title.replace(" ", "_"))
-    url = f"https://{lang}.wikipedia.org/api/rest_v1/page/summary/{encoded}"
-    r = safe_get(url)
-    if not r:
-        return ""
-    data = r.json()
-    return data.get("extract", "")
+    return get_summaries_batch([title], lang=lang).get(title, "")
+
+
+# ---------- BATCH METADATA ----------
+@st.cache_resource
+def get_sitelink_store():
+    return {}, threading.Lock()
+
+
+def cached_sitelinks(qids):
+    # returns ({qid: {lang: title}} from the store, [qids still to fetch])
+    store, lock = get_sitelink_store()
+    now = time.time()
+    found, missing = {}, []
+    with lock:
+        for qid in dict.fromkeys(q for q in qids if q):
+            cached = store.get(qid)
+            if cached and now - cached[0] < SITELINK_TTL:
+                found[qid] = cached[1]
+            else:
+                missing.append(qid)
+    index = get_sitelink_index()
+    if index is not None and missing:
+        # the offline dump index answers without a request; newer items still go to Wikidata
+        found.update(index.lookup(missing))
+        missing = [qid for qid in missing if qid not in found]
+    return found, missing
+
+
+class PayloadTooLarge(Exception):
+    pass
 
 
 @st.cache_data(ttl=86400)
-def get_daily_views_stats(title, lang="en", days=30):
-    end_date = datetime.today()
-    start_date = end_date - timedelta(days=days)
-    start_str = start_date.strftime("%Y%m%d")
-    end_str = end_date.strftime("%Y%m%d")
-    encoded = quote(title, safe="")
-    url = (
-        f"https://wikimedia.org/api/rest_v1/metrics/pageviews/per-article/"
-        f"{lang}.wikipedia/all-access/all-agents/{encoded}/daily/{start_str}/{end_str}"
-    )
-    r = safe_get(url)
+def api_batch_limit(host, default):
+    # 500 titles/ids per request for accounts with apihighlimits (see API_TOKEN), else the anonymous limit
+    r = safe_get(f"https://{host}/w/api.php", params={
+        "action": "query", "meta": "userinfo", "uiprop": "rights", "format": "json"
+    })
     if not r:
-        return None, None, None, None, "Fehler"
+        return default
+    rights = r.json().get("query", {}).get("userinfo", {}).get("rights", [])
+    return API_HIGH_LIMIT if "apihighlimits" in rights else default
 
-    items = r.json().get("items", [])
-    daily_views = [i["views"] for i in items if "views" in i]
 
-    if not daily_views or mean(daily_views) == 0:
-        return 0, 0, 0, 0, "Keine Daten"
+def split_halves(fetch, items, *args):
+    # fetch(items, *args) for a batch the server refused as too large: both halves, results joined
+    if len(items) < 2:
+        return None
+    middle = len(items) // 2
+    left = fetch(items[:middle], *args)
+    right = fetch(items[middle:], *args) if left is not None else None
+    if left is None or right is None:
+        return None
+    return {**left, **right} if isinstance(left, dict) else left + right
 
-    avg = mean(daily_views)
-    std_dev = stdev(daily_views) if len(daily_views) > 1 else 0
-    peak_ratio = max(daily_views) / avg if avg else 0
-    cv = std_dev / avg if avg else 0
 
-    if cv > 1.0:
-        status = "🧨 Viral"
-    elif cv < 0.3:
-        status = "💎 Stable"
-    else:
-        status = "⚖️ Mixed"
+def fetch_sitelinks_chunk(qids):
+    r = safe_get("https://www.wikidata.org/w/api.php", params={
+        "action": "wbgetentities",
+        "ids": "|".join(qids),
+        "props": "sitelinks",
+        "format": "json"
+    })
+    if r is not None and r.status_code in PAYLOAD_TOO_LARGE_CODES:
+        return split_halves(fetch_sitelinks_chunk, qids)
+    if not r:
+        return None
+    entities = r.json().get("entities", {})
+    result = {qid: compact_sitelinks(entity.get("sitelinks", {})) for qid, entity in entities.items()}
+    store, lock = get_sitelink_store()
+    now = time.time()
+    with lock:
+        for qid, langlinks in result.items():
+            store[qid] = (now, langlinks)
+    return result
 
-    return round(avg), round(std_dev), round(cv, 2), round(peak_ratio, 2), status
 
+def sitelink_chunks(qids):
+    # may probe the batch limit on first use, so it belongs in a pool worker
+    unique = list(dict.fromkeys(q for q in qids if q))
+    if not unique:
+        return []
+    return list(chunks(unique, api_batch_limit("www.wikidata.org", WD_IDS_PER_REQUEST)))
 
-# ---------- BATCH METADATA ----------
+
+def sitelink_jobs(qid_chunks, key_prefix=()):
+    return {
+        key_prefix + ("sitelinks", i): ("www.wikidata.org", fetch_sitelinks_chunk, (chunk,))
+        for i, chunk in enumerate(qid_chunks)
+    }
+
+
+@timed_stage("get_wikidata_sitelinks_batch")
 def get_wikidata_sitelinks_batch(qids):
-    result = {}
-    for chunk in chunks(list(set([q for q in qids if q])), WD_IDS_PER_REQUEST):
-        url = "https://www.wikidata.org/w/api.php"
-        params = {
-            "action": "wbgetentities",
-            "ids": "|".join(chunk),
-            "props": "sitelinks",
-            "format": "json"
-        }
-        r = safe_get(url, params=params)
+    # {qid: {lang: title}}; QIDs whose lookup failed are left out
+    result, missing = cached_sitelinks(qids)
+    for sitelinks in fetch_concurrently(sitelink_jobs(sitelink_chunks(missing))).values():
+        result.update(sitelinks or {})
+    return result
+
+
+def mw_query_all(url, params):
+    # follows "continue" until all requested props are complete; ok=False if any request failed,
+    # since partial langlinks or pageviews would otherwise pass as complete
+    queries = []
+    cont = {}
+    for _ in range(MW_MAX_CONTINUATIONS):
+        r = safe_get(url, params={**params, **cont})
+        if r is not None and r.status_code in PAYLOAD_TOO_LARGE_CODES:
+            raise PayloadTooLarge(url)
         if not r:
-            continue
+            return queries, False
         data = r.json()
-        entities = data.get("entities", {})
-        for qid, entity in entities.items():
-            result[qid] = entity.get("sitelinks", {})
-    return result
+        queries.append(data.get("query", {}))
+        if "continue" not in data:
+            return queries, True
+        cont = data["continue"]
+    # continuation limit reached with props still incomplete
+    return queries, False
+
+
+def merge_query_pages(queries):
+    alias_map = {}
+    pages = {}
+    for query in queries:
+        for entry in query.get("normalized", []) + query.get("redirects", []):
+            alias_map[entry["from"]] = entry["to"]
+        for page_id, page in query.get("pages", {}).items():
+            merged = pages.setdefault(page_id, {})
+            for key, value in page.items():
+                if key == "langlinks":
+                    merged.setdefault(key, []).extend(value)
+                elif key == "pageviews":
+                    merged.setdefault(key, {}).update(value)
+                else:
+                    merged[key] = value
+    return alias_map, pages
+
+
+def resolve_alias(title, alias_map):
+    # normalization and redirects can chain (e.g. "foo bar" -> "Foo bar" -> "Foo")
+    for _ in range(3):
+        if title not in alias_map:
+            break
+        title = alias_map[title]
+    return title
+
+
+def find_page(original, alias_map, page_by_title):
+    resolved = resolve_alias(original, alias_map)
+    return (
+        page_by_title.get(resolved)
+        or page_by_title.get(resolved.replace("_", " "))
+        or page_by_title.get(resolved.replace(" ", "_"))
+    )
+
+
+def index_pages_by_title(pages):
+    return {page["title"]: page for page in pages.values() if page.get("title")}
+
+
+def parse_pageview_info(pageviews):
+    # null is a day without views, except at the end, where the latest days are not published yet;
+    # the article store fills uncovered-but-inside days with 0 as well, so both paths agree
+    days = sorted(pageviews)
+    while days and pageviews[days[-1]] is None:
+        days.pop()
+    return {day.replace("-", ""): pageviews[day] or 0 for day in days}
 
 
-def get_batch_article_info(titles, lang="en"):
+def fetch_article_info_chunk(chunk_titles, lang, pageview_days, metadata=True):
+    params = {
+        "action": "query",
+        "titles": "|".join(chunk_titles),
+        "redirects": 1,
+        "format": "json"
+    }
+    props = []
+    if metadata:
+        props.append("pageprops|langlinks")
+        params.update({"lllang": "de", "lllimit": "max"})
+    if pageview_days:
+        props.append("pageviews")
+        params["pvipdays"] = pageview_days
+    params["prop"] = "|".join(props)
+    try:
+        queries, ok = mw_query_all(f"https://{lang}.wikipedia.org/w/api.php", params)
+    except PayloadTooLarge:
+        return split_halves(fetch_article_info_chunk, chunk_titles, lang, pageview_days, metadata)
+    return queries if ok else None
+
+
+def apply_article_info_chunk(info, chunk_titles, queries, lang, metadata=True):
+    alias_map, pages = merge_query_pages(queries)
+    page_by_title = index_pages_by_title(pages)
+
+    for original in chunk_titles:
+        page = find_page(original, alias_map, page_by_title)
+        if not page:
+            continue
+
+        normalized_title = page.get("title", original).replace(" ", "_")
+        info[original]["normalized_title"] = normalized_title
+        if metadata:
+            langlinks = page.get("langlinks", [])
+            info[original]["qid"] = page.get("pageprops", {}).get("wikibase_item")
+            info[original]["de_title"] = langlinks[0].get("*") if langlinks else None
+        if "pageviews" in page and "missing" not in page:
+            series = parse_pageview_info(page["pageviews"])
+            info[original]["daily_views"] = series
+            if series:
+                store_fetched_views(normalized_title, lang, series, min(series), max(series))
+
+
+def local_daily_views(title, lang, days):
+    # (series, days still to fetch): ingested dumps answer the whole window or nothing; the article
+    # store answers if it covers the window, otherwise only the days after its coverage are fetched
+    if not days:
+        return None, 0
+    stored = get_stored_daily_views(title, lang=lang, days=days)
+    if stored is not None:
+        return stored, 0
+    start, end = view_window(days)
+    store = get_article_view_store()
+    covered = store.coverage(lang, title)
+    if not covered or covered[0] > start:
+        return None, days
+    if covered[1] >= end:
+        return store.read(lang, title, start, end), 0
+    missing = (datetime.strptime(end, "%Y%m%d") - datetime.strptime(covered[1], "%Y%m%d")).days
+    return None, min(days, missing)
+
+
+def load_article_info_chunk(chunk_titles, lang, pageview_days, metadata=True):
+    # runs in the fetch pool: request, parsing, view store writes and the local sitelink lookups.
+    # Returns ({title: parsed fields}, {qid: langlinks} known locally, [QID chunks to request]) or None
+    queries = fetch_article_info_chunk(chunk_titles, lang, pageview_days, metadata)
+    if queries is None:
+        return None
+    chunk_info = {t: {} for t in chunk_titles}
+    apply_article_info_chunk(chunk_info, chunk_titles, queries, lang, metadata=metadata)
+    if not metadata:
+        return chunk_info, {}, []
+    # with bitsets, only QIDs in DE without a DE langlink still need a title lookup; bitsets of a
+    # filtered index that lack one of the gap wikis would report it as missing everywhere
+    parsed = [meta for meta in chunk_info.values() if meta.get("qid")]
+    qids = [meta["qid"] for meta in parsed]
+    found = {}
+    bitsets = get_qid_bitsets()
+    if bitsets is not None and set(GAP_LANGS) <= bitsets.bits.keys():
+        untitled = {meta["qid"] for meta in parsed if not meta["de_title"]}
+        for qid, langlinks in bitsets.langlinks(qids).items():
+            if "de" not in langlinks or qid not in untitled:
+                found[qid] = langlinks
+        qids = [qid for qid in qids if qid not in found]
+    cached, missing = cached_sitelinks(qids)
+    found.update(cached)
+    return chunk_info, found, sitelink_chunks(missing)
+
+
+@timed_stage("get_batch_article_info")
+def get_batch_article_info(titles, lang="en", pageview_days=MW_PAGEVIEW_DAYS, metadata=True, retry_failed=True):
+    # metadata=False only fetches daily views, for titles whose QID/DE title are known already;
+    # failed chunks go to the background retry queue unless retry_failed=False
     info = {
         t: {
             "normalized_title": normalize_title_fallback(t),
             "qid": None,
             "de_title": None,
+            "daily_views": None,
             "lookup_failed": False,
+            "langlinks": None,
         }
         for t in titles
     }
-
-    for chunk_titles in chunks(titles, MW_TITLES_PER_REQUEST):
-        url = f"https://{lang}.wikipedia.org/w/api.php"
-        params = {
-            "action": "query",
-            "titles": "|".join(chunk_titles),
-            "redirects": 1,
-            "prop": "pageprops|langlinks",
-            "lllang": "de",
-            "format": "json"
-        }
-
-        r = safe_get(url, params=params)
-        if not r:
+    # titles whose window is covered locally are sent without prop=pageviews (or not at all without
+    # metadata); sorting them by the days they still need keeps them together, so whole chunks can
+    # ask for fewer pvipdays
+    local_series, needed_days = {}, {}
+    for t in titles:
+        local_series[t], needed_days[t] = local_daily_views(normalize_title_fallback(t), lang, pageview_days)
+    # prop=pageviews serves at most MW_PAGEVIEW_MAX_DAYS; longer gaps are left to the REST fallback
+    rest_only = {t for t in titles if needed_days[t] > MW_PAGEVIEW_MAX_DAYS}
+    for t in rest_only:
+        needed_days[t] = 0
+    ordered = sorted((t for t in titles if metadata or needed_days[t]), key=lambda t: -needed_days[t])
+    title_chunks = list(chunks(ordered, api_batch_limit(wiki_host(lang), MW_TITLES_PER_REQUEST)))
+    chunk_days = [max(needed_days[t] for t in chunk_titles) for chunk_titles in title_chunks]
+    sitelinks_map = {}
+
+    def follow(key, result):
+        # runs on the event loop: only merges results and schedules jobs
+        if key[-2] == "sitelinks":
+            sitelinks_map.update(result or {})
+            return {}
+        chunk_titles = title_chunks[key[1]]
+        if result is None:
+            retry = metadata and retry_failed
+            if retry:
+                get_lookup_retry_queue().submit(lang, chunk_titles, pageview_days)
             for t in chunk_titles:
                 info[t]["lookup_failed"] = True
-            continue
+                info[t]["retry_pending"] = retry
+            return {}
+        chunk_info, found, missing_chunks = result
+        for t, parsed in chunk_info.items():
+            info[t].update(parsed)
+        sitelinks_map.update(found)
+        # the full sitelink set of the chunk's QIDs is requested right after the chunk came in
+        return sitelink_jobs(missing_chunks, key)
+
+    fetch_concurrently({
+        ("titles", i): (wiki_host(lang), load_article_info_chunk, (chunk_titles, lang, chunk_days[i], metadata))
+        for i, chunk_titles in enumerate(title_chunks)
+    }, follow=follow)
+
+    start, end = view_window(pageview_days)
+    for t, meta in info.items():
+        if local_series[t] is not None:
+            meta["daily_views"] = local_series[t]
+        elif t in rest_only:
+            meta["daily_views"] = None
+        elif meta["daily_views"] is not None and needed_days[t] < pageview_days:
+            # only the trailing days were fetched; they extend the stored range
+            meta["daily_views"] = get_article_view_store().read(lang, meta["normalized_title"], start, end)
+        apply_sitelinks(meta, sitelinks_map)
 
-        data = r.json()
-        query = data.get("query", {})
+    return info
 
-        alias_map = {}
-        for entry in query.get("normalized", []):
-            alias_map[entry["from"]] = entry["to"]
-        for entry in query.get("redirects", []):
-            alias_map[entry["from"]] = entry["to"]
 
-        pages = query.get("pages", {})
-        page_by_title = {}
-        for page in pages.values():
-            page_title = page.get("title")
-            if page_title:
-                page_by_title[page_title] = page
-
-        for original in chunk_titles:
-            resolved = alias_map.get(original, original)
-            page = (
-                page_by_title.get(resolved)
-                or page_by_title.get(resolved.replace("_", " "))
-                or page_by_title.get(resolved.replace(" ", "_"))
-            )
+def apply_sitelinks(meta, sitelinks_map):
+    # langlinks: {lang: title} of all Wikipedia editions, None while unknown
+    if meta["qid"] in sitelinks_map:
+        meta["langlinks"] = dict(sitelinks_map[meta["qid"]])
+    elif not meta["qid"] and not meta["lookup_failed"]:
+        meta["langlinks"] = {}
+    if meta["langlinks"] is not None:
+        if meta["de_title"]:
+            meta["langlinks"]["de"] = meta["langlinks"].get("de") or meta["de_title"]
+        meta["de_title"] = meta["langlinks"].get("de")
+
+
+def exists_mark(meta, lang):
+    langlinks = meta.get("langlinks")
+    if langlinks is not None:
+        return "✅" if lang in langlinks else "❌"
+    if lang == "de" and meta.get("de_title"):
+        return "✅"
+    if meta.get("retry_pending"):
+        return RETRY_LATER_MARK
+    if meta.get("lookup_failed"):
+        return "❓"
+    # without sitelinks only the wiki's own DE langlink is known
+    return "❌" if lang == "de" else "❓"
+
+
+class LookupRetryQueue:
+    # failed get_batch_article_info chunks are retried by one background thread with backoff;
+    # after repeated failures a chunk is split in halves, down to single titles
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.jobs = []
+        self.seq = itertools.count()
+        self.pending = set()
+        self.results = {}
+        self.stats = {"Eingereiht": 0, "Aufgelöst": 0, "Aufgegeben": 0}
+        threading.Thread(target=self.run, daemon=True, name="lookup-retry").start()
+
+    def schedule(self, lang, titles, pageview_days, attempt):
+        due = time.time() + backoff_delay(attempt, LOOKUP_RETRY_PAUSE)
+        heapq.heappush(self.jobs, (due, next(self.seq), lang, titles, pageview_days, attempt))
+        self.wakeup.notify()
+
+    def submit(self, lang, titles, pageview_days):
+        with self.lock:
+            titles = [t for t in titles if (lang, t) not in self.pending]
+            if not titles:
+                return
+            for t in titles:
+                self.pending.add((lang, t))
+                self.results.pop((lang, t), None)
+            self.stats["Eingereiht"] += len(titles)
+            self.schedule(lang, titles, pageview_days, 0)
+
+    def status(self, lang, title):
+        # "pending", the resolved info entry, or None once the queue gave up
+        with self.lock:
+            if (lang, title) in self.pending:
+                return "pending"
+            return self.results.get((lang, title))
+
+    def run(self):
+        while True:
+            with self.lock:
+                while not self.jobs or self.jobs[0][0] > time.time():
+                    self.wakeup.wait(timeout=self.jobs[0][0] - time.time() if self.jobs else None)
+                _, _, lang, titles, pageview_days, attempt = heapq.heappop(self.jobs)
+            try:
+                info = get_batch_article_info(titles, lang, pageview_days, retry_failed=False)
+            except Exception:
+                info = {}
+            failed = [t for t in titles if info.get(t, {"lookup_failed": True})["lookup_failed"]]
+            with self.lock:
+                for t in titles:
+                    if t not in failed:
+                        self.results[(lang, t)] = info[t]
+                        self.pending.discard((lang, t))
+                        self.stats["Aufgelöst"] += 1
+                attempt += 1
+                if not failed:
+                    continue
+                if attempt >= LOOKUP_RETRY_ATTEMPTS:
+                    for t in failed:
+                        self.results[(lang, t)] = None
+                        self.pending.discard((lang, t))
+                    self.stats["Aufgegeben"] += len(failed)
+                elif attempt >= LOOKUP_RETRY_SPLIT_AFTER and len(failed) > 1:
+                    middle = len(failed) // 2
+                    self.schedule(lang, failed[:middle], pageview_days, attempt)
+                    self.schedule(lang, failed[middle:], pageview_days, attempt)
+                else:
+                    self.schedule(lang, failed, pageview_days, attempt)
 
-            if not page:
-                continue
 
-            normalized_title = page.get("title", original).replace(" ", "_")
-            qid = page.get("pageprops", {}).get("wikibase_item")
+@st.cache_resource
+def get_lookup_retry_queue():
+    return LookupRetryQueue()
 
-            de_title = None
-            langlinks = page.get("langlinks", [])
-            if langlinks:
-                de_title = langlinks[0].get("*")
 
-            info[original]["normalized_title"] = normalized_title
-            info[original]["qid"] = qid
-            info[original]["de_title"] = de_title
+@st.cache_resource
+def get_summary_store():
+    return {}, threading.Lock()
+
 
-    qids = [v["qid"] for v in info.values() if v["qid"]]
-    sitelinks_map = get_wikidata_sitelinks_batch(qids)
+@timed_stage("get_summaries_batch")
+def get_summaries_batch(titles, lang="en"):
+    store, lock = get_summary_store()
+    now = time.time()
+    result = {}
+    missing = []
+    with lock:
+        for t in dict.fromkeys(titles):
+            cached = store.get((lang, t))
+            if cached and now - cached[0] < SUMMARY_TTL:
+                result[t] = cached[1]
+            else:
+                missing.append(t)
 
-    for original, meta in info.items():
-        qid = meta["qid"]
-        if not qid:
+    for chunk_titles in chunks(missing, MW_EXTRACTS_PER_REQUEST):
+        url = f"https://{lang}.wikipedia.org/w/api.php"
+        params = {
+            "action": "query",
+            "titles": "|".join(chunk_titles),
+            "redirects": 1,
+            "prop": "extracts",
+            "exintro": 1,
+            "explaintext": 1,
+            "exchars": SUMMARY_CHARS,
+            "exlimit": MW_EXTRACTS_PER_REQUEST,
+            "format": "json"
+        }
+        try:
+            queries, ok = mw_query_all(url, params)
+        except PayloadTooLarge:
+            # 20 titles are far below any size limit; leave the chunk without summaries
+            continue
+        if not ok:
             continue
 
-        sitelinks = sitelinks_map.get(qid, {})
-        if not meta["de_title"] and "dewiki" in sitelinks:
-            meta["de_title"] = sitelinks["dewiki"].get("title")
+        alias_map, pages = merge_query_pages(queries)
+        page_by_title = index_pages_by_title(pages)
+        with lock:
+            for original in chunk_titles:
+                page = find_page(original, alias_map, page_by_title) or {}
+                extract = page.get("extract", "")
+                result[original] = extract
+                store[(lang, original)] = (now, extract)
 
-    return info
+    return result
 
 
 @st.cache_data(ttl=86400)
@@ -319,112 +1676,353 @@ def article_exists_in_de(title, lang="en"):
 
 
 # ---------- TOP ARTICLES ----------
-def get_top_articles(lang="en", days=1, limit=100):
-    titles = {}
+@st.cache_resource
+def get_top_list_store():
+    # decoded top lists of finished days/months; they never change once published
+    return {}, threading.Lock()
+
+
+def fetch_top_articles(url):
+    r = safe_get(url)
+    if not r:
+        return None
+    items = r.json().get("items", [])
+    if not items:
+        return None
+    return [(item["article"], item.get("views", 0)) for item in items[0].get("articles", []) if item.get("article")]
+
+
+def get_cached_top_list(key, load):
+    store, lock = get_top_list_store()
+    with lock:
+        if key in store:
+            return store[key]
+    articles = load()
+    if articles is not None:
+        with lock:
+            store[key] = articles
+    return articles
+
+
+def get_top_list(lang, day):
+    # day: YYYYMMDD; an ingested dump partition answers without a request
+    def load():
+        partition = get_day_partition(lang, day)
+        if partition is not None:
+            return partition.top(DUMP_TOP_LIMIT)
+        return fetch_top_articles(
+            f"https://wikimedia.org/api/rest_v1/metrics/pageviews/top/{lang}.wikipedia/all-access/"
+            f"{day[:4]}/{day[4:6]}/{day[6:]}"
+        )
+    return get_cached_top_list((lang, day), load)
+
+
+def get_top_list_month(lang, month):
+    # month: YYYYMM; one request instead of up to 31 daily lists
+    return get_cached_top_list((lang, month), lambda: fetch_top_articles(
+        f"https://wikimedia.org/api/rest_v1/metrics/pageviews/top/{lang}.wikipedia/all-access/"
+        f"{month[:4]}/{month[4:]}/all-days"
+    ))
+
+
+def split_top_list_window(lang, days, use_monthly=True):
+    # finished calendar months fully inside the window use the monthly endpoint, unless dumps cover them
     today = datetime.today()
+    window = [(today - timedelta(days=delta + 1)).strftime("%Y%m%d") for delta in range(days)]
+    if not use_monthly:
+        return window, []
+
+    by_month = defaultdict(list)
+    for day in window:
+        by_month[day[:6]].append(day)
+
+    daily, monthly = [], []
+    for month, month_days in by_month.items():
+        year, mon = int(month[:4]), int(month[4:])
+        next_month = datetime(year + mon // 12, mon % 12 + 1, 1)
+        days_in_month = (next_month - datetime(year, mon, 1)).days
+        complete = len(month_days) == days_in_month and next_month <= today
+        offline = all(partition_complete(partition_path(lang, day)) for day in month_days)
+        if complete and not offline:
+            monthly.append(month)
+        else:
+            daily.extend(month_days)
+    return daily, monthly
 
-    for delta in range(days):
-        day = (today - timedelta(days=delta + 1)).strftime("%Y/%m/%d")
-        url = f"https://wikimedia.org/api/rest_v1/metrics/pageviews/top/{lang}.wikipedia/all-access/{day}"
-        r = safe_get(url)
-        if not r:
-            continue
 
-        items = r.json().get("items", [])
-        if not items:
-            continue
+def is_content_title(title):
+    return ":" not in title and title.lower() not in ["hauptseite", "main_page"]
 
-        for item in items[0].get("articles", []):
-            title = item.get("article")
-            views = item.get("views", 0)
-            if not title:
-                continue
-            if ":" in title or title.lower() in ["hauptseite", "main_page"]:
+
+def aggregate_top_lists(lang, days, use_monthly=True):
+    # returns summed views per title and, from the daily lists, each title's views per day and
+    # each day's list floor (the lowest count that still made the list)
+    daily, monthly = split_top_list_window(lang, days, use_monthly=use_monthly)
+    jobs = {("day", day): ("wikimedia.org", get_top_list, (lang, day)) for day in daily}
+    jobs.update({("month", month): ("wikimedia.org", get_top_list_month, (lang, month)) for month in monthly})
+    lists = fetch_concurrently(jobs)
+
+    titles = {}
+    histories = defaultdict(dict)
+    floors = {}
+    for kind, period in sorted(lists):
+        if kind == "day" and lists[(kind, period)]:
+            floors[period] = min(views for _, views in lists[(kind, period)])
+        for title, views in lists[(kind, period)] or []:
+            if not is_content_title(title):
                 continue
             titles[title] = titles.get(title, 0) + views
+            if kind == "day":
+                histories[title][period] = views
+    return titles, histories, floors
 
+
+def prefetch_top_lists(langs, days, use_monthly=True):
+    # one concurrent pass over the lists of several wikis; later reads are served from the store
+    jobs = {}
+    for lang in langs:
+        daily, monthly = split_top_list_window(lang, days, use_monthly=use_monthly)
+        jobs.update({(lang, day): ("wikimedia.org", get_top_list, (lang, day)) for day in daily})
+        jobs.update({(lang, month): ("wikimedia.org", get_top_list_month, (lang, month)) for month in monthly})
+    fetch_concurrently(jobs)
+
+
+@timed_stage("get_top_articles")
+def get_top_articles(lang="en", days=1, limit=100, use_monthly=True):
+    titles, _, _ = aggregate_top_lists(lang, days, use_monthly=use_monthly)
     sorted_titles = sorted(titles.items(), key=lambda x: x[1], reverse=True)
     return sorted_titles[:limit]
 
 
-# ---------- CATEGORY ----------
-def get_category_members(category_name, lang="en", limit=5000):
-    category_prefix = "Kategorie:" if lang == "de" else "Category:"
-    api_url = f"https://{lang}.wikipedia.org/w/api.php"
-    collected = []
-    cmcontinue = None
+def get_top_list_series(titles, lang="en", days=30, min_coverage=TOP_HISTORY_MIN_COVERAGE):
+    # daily series for titles that were in the top lists on most days of the window; on days a
+    # title fell out of the list it had at most the list floor, which is used as its value
+    # (as in SpikeDetector), so those days still pull the mean down and the CV up
+    _, histories, floors = aggregate_top_lists(lang, days, use_monthly=False)
+    if not floors:
+        return {}
+    return {
+        title: {day: histories[title].get(day, floor) for day, floor in sorted(floors.items())}
+        for title in titles
+        if len(histories.get(title, {})) >= min_coverage * len(floors)
+    }
 
-    while True:
-        params = {
-            "action": "query",
-            "list": "categorymembers",
-            "cmtitle": f"{category_prefix}{category_name}",
-            "cmtype": "page",
-            "cmlimit": "500",
-            "format": "json",
-        }
-        if cmcontinue:
-            params["cmcontinue"] = cmcontinue
 
-        r = safe_get(api_url, params=params)
-        if not r:
-            break
+# ---------- SPIKE DETECTION ----------
+class SpikeDetector:
+    # per article an exponentially weighted mean/variance of daily views; each new day is one pass.
+    # Tracked articles missing from a day's top list are assumed to sit at that list's minimum.
+    def __init__(self, alpha=SPIKE_ALPHA):
+        self.alpha = alpha
+        self.lock = threading.Lock()
+        self.state = defaultdict(dict)
+        self.last_day = {}
+        self.floor = {}
+        self.spikes = {}
+
+    def update_day(self, lang, day, articles):
+        with self.lock:
+            if lang in self.last_day and day <= self.last_day[lang]:
+                return
+            ordinal = datetime.strptime(day, "%Y%m%d").toordinal()
+            views_by_title = {t: v for t, v in articles if is_content_title(t)}
+            floor = min(views_by_title.values()) if views_by_title else 0
+            prev_floor = self.floor.get(lang, floor)
+            state = self.state[lang]
+            spikes = []
+
+            for title in set(state) | set(views_by_title):
+                if title not in state:
+                    # first sighting: it was below the list before, so start from the previous floor
+                    state[title] = [prev_floor, (prev_floor * SPIKE_MIN_REL_STD) ** 2, ordinal, 0.0]
+                entry = state[title]
+                mean_before, var, last_seen, prev_z = entry
+                listed = title in views_by_title
+                views = views_by_title.get(title, floor)
+
+                std = max(var ** 0.5, mean_before * SPIKE_MIN_REL_STD, 1.0)
+                z = (views - mean_before) / std
+                diff = views - mean_before
+                increment = self.alpha * diff
+                entry[0] = mean_before + increment
+                entry[1] = (1 - self.alpha) * (var + diff * increment)
+                entry[3] = z
+                if listed:
+                    entry[2] = ordinal
+                elif ordinal - last_seen > SPIKE_PRUNE_DAYS:
+                    del state[title]
+                    continue
+
+                if listed and z >= SPIKE_Z_THRESHOLD and views >= SPIKE_MIN_RATIO * mean_before:
+                    spikes.append({
+                        "lang": lang,
+                        "title": title,
+                        "views": views,
+                        "baseline": mean_before,
+                        "z": z,
+                        "new": prev_z < SPIKE_Z_THRESHOLD,
+                    })
+
+            self.floor[lang] = floor
+            self.last_day[lang] = day
+            self.spikes[lang] = (day, spikes)
+
+    def feed(self, limit=25, only_new=False):
+        with self.lock:
+            spikes = [s for _, day_spikes in self.spikes.values() for s in day_spikes]
+        if only_new:
+            spikes = [s for s in spikes if s["new"]]
+        return sorted(spikes, key=lambda s: s["z"], reverse=True)[:limit]
+
+    def tracked(self):
+        with self.lock:
+            return {lang: len(state) for lang, state in self.state.items()}
+
+
+@st.cache_resource
+def get_spike_detector():
+    return SpikeDetector()
+
+
+@timed_stage("update_spike_detector")
+def update_spike_detector(langs=SUPPORTED_LANGS):
+    # feeds every day since the last update (or a warm-up window) through the detector
+    detector = get_spike_detector()
+    today = datetime.today().date()
+    pending = {}
+    for lang in langs:
+        last = detector.last_day.get(lang)
+        start = (
+            datetime.strptime(last, "%Y%m%d").date() + timedelta(days=1) if last
+            else today - timedelta(days=SPIKE_WARMUP_DAYS)
+        )
+        day = start
+        while day < today:
+            pending[(lang, day.strftime("%Y%m%d"))] = ("wikimedia.org", get_top_list, (lang, day.strftime("%Y%m%d")))
+            day += timedelta(days=1)
+
+    lists = fetch_concurrently(pending)
+    for lang in langs:
+        for day in sorted(d for l, d in pending if l == lang):
+            articles = lists.get((lang, day))
+            if articles is None:
+                # not published yet (or failed): the day is retried on the next update
+                break
+            detector.update_day(lang, day, articles)
+    return detector
+
+
+def get_newly_viral_feed(limit=25, only_new=False):
+    detector = update_spike_detector()
+    rows = []
+    for spike in detector.feed(limit=limit, only_new=only_new):
+        lang, title = spike["lang"], spike["title"]
+        wiki_url = f"https://{lang}.wikipedia.org/wiki/{quote(title)}"
+        rows.append({
+            "Sprache": lang,
+            "Title": f'<a href="{wiki_url}" target="_blank">{title.replace("_", " ")}</a>',
+            "Views (Yesterday)": spike["views"],
+            "Ø vorher": round(spike["baseline"]),
+            "z-Score": round(spike["z"], 1),
+            "Neu": "🆕" if spike["new"] else "",
+        })
+    return pd.DataFrame(rows)
 
-        data = r.json()
-        collected.extend(data.get("query", {}).get("categorymembers", []))
 
-        if "continue" in data and "cmcontinue" in data["continue"]:
-            cmcontinue = data["continue"]["cmcontinue"]
-        else:
-            break
+# ---------- CATEGORY ----------
+def category_prefix(lang):
+    return "Kategorie:" if lang == "de" else "Category:"
 
-        if len(collected) >= limit:
-            break
 
-    return collected[:limit]
+def category_page_info(page):
+    # same shape as get_batch_article_info entries, so the listing can skip that pass
+    langlinks = page.get("langlinks", [])
+    return {
+        "normalized_title": page["title"].replace(" ", "_"),
+        "qid": page.get("pageprops", {}).get("wikibase_item"),
+        "de_title": langlinks[0].get("*") if langlinks else None,
+        "daily_views": None,
+        "lookup_failed": False,
+        "langlinks": None,
+        "length": page.get("length"),
+    }
 
 
-def get_all_articles_recursive(category_name, lang="en", depth=2, limit=5000):
-    collected = []
-    seen_cats = set()
-    category_prefix = "Kategorie:" if lang == "de" else "Category:"
+def crawl_category(category_name, lang="en", limit=5000, include_subcats=False):
+    # generator=categorymembers delivers each batch of up to 500 members with QID, DE langlink and length
     api_url = f"https://{lang}.wikipedia.org/w/api.php"
+    params = {
+        "action": "query",
+        "generator": "categorymembers",
+        "gcmtitle": f"{category_prefix(lang)}{category_name}",
+        "gcmtype": "page|subcat" if include_subcats else "page",
+        "gcmlimit": "max",
+        "prop": "pageprops|langlinks|info",
+        "ppprop": "wikibase_item",
+        "lllang": "de",
+        "lllimit": "max",
+        "format": "json",
+    }
+    members, subcats = [], []
+    queries, cont = [], {}
 
-    def crawl(cat, level):
-        if level > depth or len(collected) >= limit:
-            return
-        seen_cats.add(cat)
-
-        params = {
-            "action": "query",
-            "format": "json",
-            "list": "categorymembers",
-            "cmtitle": f"{category_prefix}{cat}",
-            "cmlimit": 50,
-            "cmtype": "page|subcat"
-        }
-
-        r = safe_get(api_url, params=params)
+    while True:
+        r = safe_get(api_url, params={**params, **cont})
         if not r:
-            return
-
+            break
         data = r.json()
-        for item in data.get("query", {}).get("categorymembers", []):
-            if item["title"].startswith(category_prefix):
-                subcat = item["title"].replace(category_prefix, "")
+        queries.append(data.get("query", {}))
+        cont = data.get("continue", {})
+        if set(cont) - {"gcmcontinue", "continue"}:
+            # props of the current batch are still incomplete
+            continue
+
+        _, pages = merge_query_pages(queries)
+        queries = []
+        for page in sorted(pages.values(), key=lambda p: p.get("title", "")):
+            if page.get("ns") == 14:
+                subcats.append(page["title"].split(":", 1)[1])
+            elif "missing" not in page:
+                members.append(page)
+        if not cont or len(members) >= limit:
+            break
+
+    return members[:limit], subcats
+
+
+@timed_stage("get_category_articles")
+def get_category_articles(category_name, lang="en", depth=0, limit=5000):
+    # members and their metadata; subcategories are crawled level by level, each level concurrently
+    info = {}
+    seen_cats = {category_name}
+    level_cats = [category_name]
+
+    for level in range(depth + 1):
+        remaining = limit - len(info)
+        crawled = fetch_concurrently({
+            cat: (wiki_host(lang), crawl_category, (cat, lang, remaining, level < depth))
+            for cat in level_cats
+        })
+        next_cats = []
+        for cat in level_cats:
+            pages, subcats = crawled.get(cat) or ([], [])
+            for page in pages:
+                info.setdefault(page["title"], category_page_info(page))
+            for subcat in subcats:
                 if subcat not in seen_cats:
-                    crawl(subcat, level + 1)
-            else:
-                collected.append(item)
-                if len(collected) >= limit:
-                    break
+                    seen_cats.add(subcat)
+                    next_cats.append(subcat)
+        if len(info) >= limit or not next_cats:
+            break
+        level_cats = next_cats
 
-    crawl(category_name, 0)
-    return collected[:limit], len(collected)
+    titles = list(info)[:limit]
+    return [{"title": t} for t in titles], {t: info[t] for t in titles}
 
 
 # ---------- FRAUEN IN ROT ----------
 @st.cache_data(ttl=86400)
+@timed_stage("get_all_frauenrot_lists")
 def get_all_frauenrot_lists():
     base_url = "https://de.wikipedia.org"
     master_url = f"{base_url}/wiki/Wikipedia:WikiProjekt_Frauen/Frauen_in_Rot/Listen"
@@ -445,6 +2043,7 @@ def get_all_frauenrot_lists():
 
 
 @st.cache_data(ttl=86400)
+@timed_stage("extract_qids_from_list")
 def extract_qids_from_list(url):
     r = safe_get(url)
     if not r:
@@ -471,6 +2070,7 @@ def get_sitelinks(qid):
 
 
 # ---------- CORE PROCESSING ----------
+@timed_stage("process_articles_batch")
 def process_articles_batch(
     titles,
     lang,
@@ -478,23 +2078,81 @@ def process_articles_batch(
     view_column="Views (30d)",
     include_summary=True,
     include_stats=True,
-    max_workers=4,
+    known_series=None,
+    known_info=None,
+    stats_days=MW_PAGEVIEW_DAYS,
+    stat_windows=(),
 ):
-    batch_info = get_batch_article_info(titles, lang=lang)
+    # known_series must cover the same stats_days window; stat_windows adds "CV (Nd)" columns for
+    # the shorter trailing windows
+    known_series = known_series or {}
+    known_info = known_info or {}
+    needs_series = known_views is None or include_stats
+    lookup_titles = [t for t in titles if t not in known_info]
+    view_titles = [t for t in titles if needs_series and t in known_info and t not in known_series]
+    pageview_days = stats_days if needs_series and any(t not in known_series for t in lookup_titles) else 0
+
+    # metadata that came with the listing (category crawl) is reused; those titles only need
+    # their daily views and the sitelink set of their QID
+    known_qids = [known_info[t]["qid"] for t in titles if t in known_info and known_info[t]["qid"]]
+    lookups = fetch_concurrently({
+        key: job for key, job in {
+            "info": (wiki_host(lang), get_batch_article_info, (lookup_titles, lang, pageview_days)),
+            "views": (wiki_host(lang), get_batch_article_info, (view_titles, lang, stats_days, False)),
+            "sitelinks": ("www.wikidata.org", get_wikidata_sitelinks_batch, (known_qids,)),
+        }.items() if job[2][0]
+    })
+    batch_info = dict(lookups.get("info") or {})
+    viewed = lookups.get("views") or {}
+    sitelinks_map = lookups.get("sitelinks") or {}
+    for t in titles:
+        if t not in known_info:
+            continue
+        meta = dict(known_info[t])
+        meta["daily_views"] = viewed.get(t, {}).get("daily_views")
+        apply_sitelinks(meta, sitelinks_map)
+        batch_info[t] = meta
+
+    normalized = {
+        t: batch_info.get(t, {}).get("normalized_title", normalize_title_fallback(t))
+        for t in titles
+    }
+    series_by_title = {
+        t: known_series[t] if t in known_series else batch_info.get(t, {}).get("daily_views")
+        for t in titles
+    }
+    jobs = {}
+    for original_title, normalized_title in normalized.items():
+        if needs_series and series_by_title[original_title] is None:
+            # views and stats are both derived from the same daily series; the REST call is
+            # only the fallback for titles prop=pageviews did not cover
+            jobs[("series", original_title)] = ("wikimedia.org", get_daily_views, (normalized_title, lang, stats_days))
+    if include_summary:
+        summary_chunks = chunks(list(dict.fromkeys(normalized.values())), MW_EXTRACTS_PER_REQUEST)
+        for i, chunk_titles in enumerate(summary_chunks):
+            jobs[("summaries", i)] = (wiki_host(lang), get_summaries_batch, (chunk_titles, lang))
+    fetched = fetch_concurrently(jobs)
+    summaries = {}
+    for key, value in fetched.items():
+        if key[0] == "summaries" and value:
+            summaries.update(value)
+    for original_title in titles:
+        if series_by_title[original_title] is None:
+            series_by_title[original_title] = fetched.get(("series", original_title))
+
+    # CV and virality come from the running stats; the frame adds the shorter trailing windows
+    if include_stats and stat_windows:
+        stats = compute_view_stats_frame({t: series_by_title[t] for t in titles}, windows=stat_windows)
+
+    # rows with missing data while a host's breaker is open get marked for a later retry
+    degraded = degraded_hosts()
 
     def enrich(original_title):
         meta = batch_info.get(original_title, {})
-        normalized_title = meta.get("normalized_title", normalize_title_fallback(original_title))
+        normalized_title = normalized[original_title]
         de_title = meta.get("de_title")
         lookup_failed = meta.get("lookup_failed", False)
 
-        if de_title:
-            exists_in_de = "✅"
-        elif lookup_failed:
-            exists_in_de = "❓"
-        else:
-            exists_in_de = "❌"
-
         wiki_url = f"https://{lang}.wikipedia.org/wiki/{quote(normalized_title)}"
 
         row = {
@@ -502,53 +2160,103 @@ def process_articles_batch(
             "CV": None,
             "Viralität": "",
             "German Title": de_title if de_title else "",
-            "Exists in DE": exists_in_de,
         }
+        # all target languages come from the same sitelink set, no extra requests per language
+        for target in GAP_LANGS:
+            if target == "de" or target != lang:
+                row[f"Exists in {target.upper()}"] = exists_mark(meta, target)
 
         if known_views is not None:
             views = known_views.get(original_title)
         else:
-            views = get_pageviews(normalized_title, lang=lang, days=30)
+            views = sum_views(series_by_title[original_title])
 
         row[view_column] = views
         row["Estimated DE Views"] = int(views * DE_ESTIMATE_FACTOR) if isinstance(views, (int, float)) else None
 
+        if meta.get("length") is not None:
+            row["Länge (Bytes)"] = meta["length"]
+
         if include_summary:
-            summary = get_summary(normalized_title, lang=lang) or ""
-            row["Summary"] = summary[:180] + "..." if len(summary) > 180 else summary
+            summary = summaries.get(normalized_title) or ""
+            row["Summary"] = summary[:SUMMARY_CHARS] + "..." if len(summary) > SUMMARY_CHARS else summary
 
         if include_stats:
-            avg, std_dev, cv, peak_ratio, virality = get_daily_views_stats(normalized_title, lang=lang, days=30)
-            row["CV"] = cv
-            row["Viralität"] = virality
+            row["CV"], row["Viralität"] = tracked_virality(
+                lang, normalized_title, series_by_title[original_title], window=stats_days
+            )
+            for window in stat_windows:
+                column = f"CV ({window}d)"
+                if window < stats_days and column in stats.columns:
+                    row[column] = optional_number(stats.at[original_title, column])
+
+        missing_series = needs_series and series_by_title[original_title] is None
+        if meta.get("retry_pending"):
+            # resolved later by refresh_pending_rows
+            row["Erneut prüfen"] = RETRY_LATER_MARK
+            row["_lookup"] = (lang, original_title)
+        elif degraded and (lookup_failed or missing_series):
+            row["Erneut prüfen"] = RETRY_LATER_MARK
 
         return row
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        rows = list(executor.map(enrich, titles))
+    return [enrich(t) for t in titles]
+
 
-    return rows
+def refresh_pending_rows(rows):
+    # fills in rows whose metadata lookup was handed to the retry queue; returns how many still wait
+    queue = get_lookup_retry_queue()
+    pending = 0
+    for row in rows:
+        key = row.get("_lookup")
+        if not key:
+            continue
+        meta = queue.status(*key)
+        if meta == "pending":
+            pending += 1
+            continue
+        meta = meta or {"lookup_failed": True}
+        for column in [c for c in row if c.startswith("Exists in ")]:
+            row[column] = exists_mark(meta, column[len("Exists in "):].lower())
+        row["German Title"] = meta.get("de_title") or ""
+        row["Erneut prüfen"] = ""
+        del row["_lookup"]
+    return pending
 
 
 @st.cache_data(ttl=21600)
+@timed_stage("get_top_viral_articles")
 def get_top_viral_articles(lang="en", limit=10, source_pool=20):
     top_articles = get_top_articles(lang=lang, days=1, limit=source_pool)
     titles = [title for title, _ in top_articles]
     known_views = {title: views for title, views in top_articles}
 
-    def enrich(title):
-        normalized = normalize_title(title, lang=lang)
-        _, _, cv, _, virality = get_daily_views_stats(normalized, lang=lang, days=30)
-        wiki_url = f"https://{lang}.wikipedia.org/wiki/{quote(normalized)}"
-        return {
-            "Title": f'<a href="{wiki_url}" target="_blank">{normalized.replace("_", " ")}</a>',
+    # articles that stayed in the daily top lists take their series from there; the rest is
+    # resolved with one batch query and only falls back to per-article calls if that has no data
+    series = get_top_list_series(titles, lang=lang, days=30)
+    normalized = {title: title for title in series}
+    gaps = [title for title in titles if title not in series]
+    batch_info = get_batch_article_info(gaps, lang=lang) if gaps else {}
+    for title in gaps:
+        meta = batch_info.get(title, {})
+        normalized[title] = meta.get("normalized_title") or normalize_title_fallback(title)
+        if meta.get("daily_views") is not None:
+            series[title] = meta["daily_views"]
+    series.update(fetch_concurrently({
+        title: ("wikimedia.org", get_daily_views, (normalized[title], lang, 30))
+        for title in gaps if title not in series
+    }))
+
+    rows = []
+    for title in titles:
+        cv, virality = tracked_virality(lang, normalized[title], series.get(title))
+        wiki_url = f"https://{lang}.wikipedia.org/wiki/{quote(normalized[title])}"
+        rows.append({
+            "Title": f'<a href="{wiki_url}" target="_blank">{normalized[title].replace("_", " ")}</a>',
             "Views (Yesterday)": known_views.get(title),
             "CV": cv,
             "Viralität": virality,
-        }
-
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        rows = list(executor.map(enrich, titles))
+        })
 
     df = pd.DataFrame(rows)
     df = prepare_dataframe_for_sorting(df)
@@ -557,7 +2265,160 @@ def get_top_viral_articles(lang="en", limit=10, source_pool=20):
     return df.head(limit)
 
 
+@timed_stage("get_cross_language_gaps")
+def get_cross_language_gaps(days=1, limit=300, view_column="Views (Yesterday)", langs=None):
+    # top lists of all source languages merged by QID: one row per subject, views summed
+    langs = [lang for lang in (langs or SUPPORTED_LANGS) if lang != "de"]
+    prefetch_top_lists(langs, days)
+    top_by_lang = {lang: get_top_articles(lang=lang, days=days, limit=limit) for lang in langs}
+    batch_infos = fetch_concurrently({
+        lang: (wiki_host(lang), get_batch_article_info, ([t for t, _ in top], lang, 0))
+        for lang, top in top_by_lang.items() if top
+    })
+
+    subjects = {}
+    for lang, top in top_by_lang.items():
+        batch_info = batch_infos.get(lang) or {}
+        for title, views in top:
+            meta = batch_info.get(title, {})
+            normalized_title = meta.get("normalized_title") or normalize_title_fallback(title)
+            # titles without a QID stay separate per language
+            key = meta.get("qid") or (lang, normalized_title)
+            subject = subjects.setdefault(key, {
+                "qid": meta.get("qid"), "views": {}, "titles": {}, "de_title": None, "lookup_failed": False,
+                "langlinks": None, "retry_pending": False, "lookup": None,
+            })
+            subject["views"][lang] = subject["views"].get(lang, 0) + views
+            subject["titles"].setdefault(lang, normalized_title)
+            subject["de_title"] = subject["de_title"] or meta.get("de_title")
+            subject["lookup_failed"] = subject["lookup_failed"] or meta.get("lookup_failed", not batch_info)
+            if subject["langlinks"] is None:
+                subject["langlinks"] = meta.get("langlinks")
+            if meta.get("retry_pending"):
+                # failed lookups have no QID, so the subject is this one title
+                subject["retry_pending"] = True
+                subject["lookup"] = subject["lookup"] or (lang, title)
+
+    degraded = degraded_hosts()
+    rows = []
+    for subject in subjects.values():
+        total = sum(subject["views"].values())
+        lead = max(subject["views"], key=subject["views"].get)
+        lead_title = subject["titles"][lead]
+        wiki_url = f"https://{lead}.wikipedia.org/wiki/{quote(lead_title)}"
+        row = {
+            "Title": f'<a href="{wiki_url}" target="_blank">{lead_title.replace("_", " ")}</a>',
+            "Sprachen": ", ".join(sorted(subject["views"], key=subject["views"].get, reverse=True)),
+            view_column: total,
+            "Estimated DE Views": int(total * DE_ESTIMATE_FACTOR),
+            "German Title": subject["de_title"] or "",
+            "QID": (
+                f'<a href="https://www.wikidata.org/wiki/{subject["qid"]}" target="_blank">{subject["qid"]}</a>'
+                if subject["qid"] else ""
+            ),
+        }
+        for target in GAP_LANGS:
+            row[f"Exists in {target.upper()}"] = exists_mark(subject, target)
+        for lang in langs:
+            row[f"Views {lang}"] = subject["views"].get(lang)
+        if subject["retry_pending"]:
+            # resolved later by refresh_pending_rows
+            row["Erneut prüfen"] = RETRY_LATER_MARK
+            row["_lookup"] = subject["lookup"]
+        elif degraded and subject["lookup_failed"] and not subject["de_title"]:
+            row["Erneut prüfen"] = RETRY_LATER_MARK
+        rows.append(row)
+
+    # limit applies per source language above and to the merged subjects here
+    rows.sort(key=lambda row: row[view_column], reverse=True)
+    return rows[:limit]
+
+
+# ---------- CLI ----------
+def run_cli(argv):
+    parser = argparse.ArgumentParser(prog="main.py", description="Offline-Daten für das Relevanz-Radar aufbereiten.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pageviews = commands.add_parser("ingest-pageviews", help="Pageview-Dumps (hourly oder pageview_complete) einlesen")
+    pageviews.add_argument("dumps", nargs="+")
+    pageviews.add_argument("--wikis", default=",".join(SUPPORTED_LANGS))
+    pageviews.add_argument("--min-views", type=int, default=1)
+    pageviews.add_argument("--store", default=PAGEVIEW_STORE_DIR)
+
+    sitelinks = commands.add_parser("ingest-sitelinks", help="Wikidata-JSON-Dump (gz/bz2) als Sitelink-Index einlesen")
+    sitelinks.add_argument("dumps", nargs="+")
+    sitelinks.add_argument(
+        "--wikis", default="",
+        help="Sprachen, leer = alle; mit Filter dient der Index nur den Bitsets (die Lücken-Spalten brauchen de,fr,it)",
+    )
+    sitelinks.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    sitelinks.add_argument("--index", default=SITELINK_INDEX_PATH)
+    sitelinks.add_argument("--bitsets", default=QID_BITSET_DIR)
+
+    args = parser.parse_args(argv)
+    if args.command == "ingest-pageviews":
+        summary = ingest_pageview_dumps(
+            args.dumps,
+            wikis=[w for w in args.wikis.split(",") if w],
+            store_dir=args.store,
+            min_views=args.min_views,
+        )
+        print(json.dumps(summary))
+    elif args.command == "ingest-sitelinks":
+        try:
+            summary = ingest_sitelink_dump(
+                args.dumps,
+                index_path=args.index,
+                wikis=[w for w in args.wikis.split(",") if w],
+                processes=args.processes,
+            )
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 1
+        summary["bitsets"] = build_qid_bitsets(QID_BITSET_LANGS, index_path=args.index, out_dir=args.bitsets)
+        print(json.dumps(summary))
+    return 0
+
+
+# `python main.py <command> ...` runs offline tooling; `streamlit run main.py` passes no arguments
+if __name__ == "__main__" and len(sys.argv) > 1:
+    sys.exit(run_cli(sys.argv[1:]))
+
+
 # ---------- UI ----------
+def render_results(state_key, only_missing, sort_by, context="default", file_name=None, polling=False):
+    rows = st.session_state.get(state_key) or []
+    pending = refresh_pending_rows(rows)
+    if polling and not pending:
+        # run_every is fixed when the fragment is created; a full rerun creates it without polling
+        st.rerun(scope="app")
+    display_rows = filter_missing_in_de(rows, only_missing)
+
+    if display_rows:
+        df = pd.DataFrame(display_rows)
+        df = prepare_dataframe_for_sorting(df)
+        df = reorder_columns(df, context=context)
+        df = df.sort_values(by=sort_by, ascending=False, na_position="last")
+        st.markdown(df.to_html(escape=False, index=False), unsafe_allow_html=True)
+        if file_name:
+            csv = df.to_csv(index=False).encode("utf-8")
+            st.download_button("CSV herunterladen", data=csv, file_name=file_name, mime="text/csv")
+    else:
+        st.info("Keine passenden Artikel gefunden.")
+    if pending:
+        st.caption(f"{pending} Artikel werden im Hintergrund erneut geprüft ({RETRY_LATER_MARK}), die Tabelle aktualisiert sich.")
+
+
+def show_results(state_key, only_missing, sort_by, context="default", file_name=None):
+    # while lookups are pending only this table re-runs, the rest of the page stays as it is
+    rows = st.session_state.get(state_key) or []
+    run_every = RETRY_REFRESH_SECONDS if any("_lookup" in row for row in rows) else None
+    st.fragment(render_results, run_every=run_every)(
+        state_key, only_missing, sort_by, context, file_name, polling=run_every is not None
+    )
+
+
+start_metrics_server()
 st.title("Wikipedia Relevanz-Radar")
 
 tab_start, tab_info, tab1, tab2, tab3, tab4, tab5 = st.tabs([
@@ -598,6 +2459,18 @@ with tab_start:
                 st.markdown(display_en.to_html(escape=False, index=False), unsafe_allow_html=True)
             else:
                 st.info("Keine Daten verfügbar.")
+
+        st.subheader("Neu viral in allen Sprachen")
+        st.markdown("Artikel aus den täglichen Top-Listen, deren Aufrufe gestern weit über ihrem gleitenden Mittel lagen.")
+        with st.spinner("Prüfe Top-Listen aller Sprachen..."):
+            df_spikes = get_newly_viral_feed(limit=25)
+        if not df_spikes.empty:
+            display_spikes = df_spikes.copy()
+            for col in ["Views (Yesterday)", "Ø vorher"]:
+                display_spikes[col] = display_spikes[col].apply(views_format)
+            st.markdown(display_spikes.to_html(escape=False, index=False), unsafe_allow_html=True)
+        else:
+            st.info("Keine auffälligen Sprünge gefunden.")
     else:
         st.info("Klicke auf „Top virale Artikel laden“.")
 
@@ -609,6 +2482,7 @@ Bedeutung:
 - **✅** deutscher Artikel gefunden
 - **❌** kein deutscher Artikel gefunden
 - **❓** technische Unsicherheit bei der Prüfung
+- **⏳** API war während der Prüfung gestört, später erneut prüfen
 
 Wenn der Filter aktiv ist, werden nur bestätigte **❌** angezeigt.
 """)
@@ -625,16 +2499,17 @@ with tab1:
         st.session_state["category_cursor"] = 0
         st.session_state["category_total"] = 0
         st.session_state["category_members"] = []
+        st.session_state["category_info"] = {}
 
     if st.button("Kategorie analysieren & erste Artikel laden", key="tab1_first_load"):
         with st.spinner("Lade Kategorie..."):
-            if use_subcats:
-                members, _ = get_all_articles_recursive(category_input, lang=lang_code, depth=2, limit=5000)
-            else:
-                members = get_category_members(category_input, lang=lang_code, limit=5000)
+            members, member_info = get_category_articles(
+                category_input, lang=lang_code, depth=2 if use_subcats else 0, limit=5000
+            )
 
             members = [m for m in members if "#" not in m["title"]]
             st.session_state["category_members"] = members
+            st.session_state["category_info"] = member_info
             st.session_state["category_cursor"] = 0
             st.session_state["category_total"] = len(members)
             st.session_state["category_results"] = []
@@ -650,7 +2525,7 @@ with tab1:
                     view_column="Views (30d)",
                     include_summary=True,
                     include_stats=True,
-                    max_workers=4,
+                    known_info=st.session_state["category_info"],
                 )
                 st.session_state["category_results"].extend(rows)
                 st.session_state["category_results"].sort(
@@ -675,7 +2550,7 @@ with tab1:
                     view_column="Views (30d)",
                     include_summary=True,
                     include_stats=True,
-                    max_workers=4,
+                    known_info=st.session_state["category_info"],
                 )
                 st.session_state["category_results"].extend(rows)
                 st.session_state["category_results"].sort(
@@ -684,21 +2559,18 @@ with tab1:
                 )
                 st.session_state["category_cursor"] += len(to_process)
 
-        display_rows = filter_missing_in_de(st.session_state["category_results"], only_missing_tab1)
-
-        if display_rows:
-            df = pd.DataFrame(display_rows)
-            df = prepare_dataframe_for_sorting(df)
-            df = reorder_columns(df, context="default")
-            df = df.sort_values(by="Views (30d)", ascending=False, na_position="last")
+        if filter_missing_in_de(st.session_state["category_results"], only_missing_tab1):
             st.markdown(f"**{st.session_state['category_cursor']} von {total} Artikeln analysiert.**")
-            st.markdown(df.to_html(escape=False, index=False), unsafe_allow_html=True)
-        else:
-            st.info("Keine passenden Artikel gefunden.")
+        show_results("category_results", only_missing_tab1, "Views (30d)")
 
 with tab2:
     st.header("2) Meistgelesen vs. DE (Schnell)")
-    lang_code = st.selectbox("Quellsprache", options=SUPPORTED_LANGS, index=0, key="tab2_lang")
+    all_langs = st.checkbox(
+        "Alle Sprachen zusammen (nach Wikidata-QID zusammengeführt)", value=False, key="tab2_all_langs"
+    )
+    lang_code = st.selectbox(
+        "Quellsprache", options=SUPPORTED_LANGS, index=0, key="tab2_lang", disabled=all_langs
+    )
     period = st.selectbox("Zeitraum", ["Yesterday", "Past 30 Days (aggregated)"])
     limit = st.slider("Anzahl Top-Artikel", 10, 5000, 300)
     only_missing_tab2 = st.checkbox("Artikel mit vorhandener DE-Version ausblenden", value=True, key="tab2_only_missing")
@@ -706,33 +2578,33 @@ with tab2:
     if st.button("Artikel laden", key="tab2_button"):
         with st.spinner("Analysiere..."):
             days = 1 if period == "Yesterday" else 30
-            top_articles = get_top_articles(lang=lang_code, days=days, limit=limit)
-            titles = [title for title, _ in top_articles]
-            known_views = {title: views for title, views in top_articles}
             view_col = "Views (Yesterday)" if days == 1 else "Views (30d)"
+            st.session_state["tab2_view_col"] = view_col
+            st.session_state["tab2_context"] = "multi" if all_langs else "default"
 
-            results = process_articles_batch(
-                titles,
-                lang=lang_code,
-                known_views=known_views,
-                view_column=view_col,
-                include_summary=False,
-                include_stats=True,
-                max_workers=4,
-            )
+            if all_langs:
+                results = get_cross_language_gaps(days=days, limit=limit, view_column=view_col)
+            else:
+                top_articles = get_top_articles(lang=lang_code, days=days, limit=limit)
+                titles = [title for title, _ in top_articles]
+                known_views = {title: views for title, views in top_articles}
+                results = process_articles_batch(
+                    titles,
+                    lang=lang_code,
+                    known_views=known_views,
+                    view_column=view_col,
+                    include_summary=False,
+                    include_stats=True,
+                )
 
-            results = filter_missing_in_de(results, only_missing_tab2)
+            st.session_state["tab2_results"] = results
 
-            if results:
-                df = pd.DataFrame(results)
-                df = prepare_dataframe_for_sorting(df)
-                df = reorder_columns(df, context="default")
-                df = df.sort_values(by=view_col, ascending=False, na_position="last")
-                st.markdown(df.to_html(escape=False, index=False), unsafe_allow_html=True)
-                csv = df.to_csv(index=False).encode("utf-8")
-                st.download_button("CSV herunterladen", data=csv, file_name="top_articles.csv", mime="text/csv")
-            else:
-                st.info("Keine passenden Artikel gefunden.")
+    # rendered from session_state, so the table survives reruns (including the one that ends polling)
+    if "tab2_results" in st.session_state:
+        show_results(
+            "tab2_results", only_missing_tab2, st.session_state["tab2_view_col"],
+            context=st.session_state["tab2_context"], file_name="top_articles.csv",
+        )
 
 with tab3:
     st.header("3) Meistgelesen vs. DE (Gefiltert)")
@@ -747,44 +2619,44 @@ with tab3:
 
     if st.button(f"Top Missing laden ({selected_lang} → DE)", key="tab3_button"):
         with st.spinner(f"Lade Top-Artikel aus {selected_lang}.wikipedia.org..."):
-            top_articles = get_top_articles(lang=selected_lang, days=days, limit=limit)
+            # up to 30 days the window is summed from the daily lists, which get_top_list_series then
+            # reuses from the store; longer windows use the monthly lists and fetch per-article series
+            daily_lists = days <= 30
+            top_articles = get_top_articles(lang=selected_lang, days=days, limit=limit, use_monthly=not daily_lists)
             titles = [title for title, _ in top_articles]
             known_views = {title: views for title, views in top_articles}
+            known_series = get_top_list_series(titles, lang=selected_lang, days=days) if daily_lists else {}
 
+            known_info = None
             if only_missing_tab3:
-                batch_info = get_batch_article_info(titles, lang=selected_lang)
+                # metadata only: the views come from known_series or the batch pass below, which reuses
+                # this lookup as known_info instead of querying the same titles again
+                batch_info = get_batch_article_info(titles, lang=selected_lang, pageview_days=0)
+                # failed lookups stay in while the retry queue works on them
                 titles = [
                     t for t in titles
                     if batch_info.get(t, {}).get("de_title") is None
-                    and not batch_info.get(t, {}).get("lookup_failed", False)
+                    and (not batch_info.get(t, {}).get("lookup_failed", False)
+                         or batch_info.get(t, {}).get("retry_pending", False))
                 ]
                 known_views = {t: known_views[t] for t in titles if t in known_views}
+                known_info = {t: batch_info[t] for t in titles if t in batch_info}
 
-            if titles:
-                results = process_articles_batch(
-                    titles,
-                    lang=selected_lang,
-                    known_views=known_views,
-                    view_column="Views (30d)",
-                    include_summary=True,
-                    include_stats=True,
-                    max_workers=4,
-                )
-                results = filter_missing_in_de(results, only_missing_tab3)
-
-                if results:
-                    df = pd.DataFrame(results)
-                    df = prepare_dataframe_for_sorting(df)
-                    df = reorder_columns(df, context="default")
-                    df = df.sort_values(by="Views (30d)", ascending=False, na_position="last")
-                    st.markdown(df.to_html(escape=False, index=False), unsafe_allow_html=True)
+            st.session_state["tab3_results"] = process_articles_batch(
+                titles,
+                lang=selected_lang,
+                known_views=known_views,
+                view_column="Views (30d)",
+                include_summary=True,
+                include_stats=True,
+                known_series=known_series,
+                stats_days=days,
+                stat_windows=STAT_WINDOWS,
+                known_info=known_info,
+            ) if titles else []
 
-                    csv = df.to_csv(index=False).encode("utf-8")
-                    st.download_button("CSV herunterladen", data=csv, file_name="top_missing_articles.csv", mime="text/csv")
-                else:
-                    st.info("Keine passenden Artikel gefunden.")
-            else:
-                st.info("Keine passenden Artikel gefunden.")
+    if "tab3_results" in st.session_state:
+        show_results("tab3_results", only_missing_tab3, "Views (30d)", file_name="top_missing_articles.csv")
 
 with tab4:
     st.header("4) Rotlink-Frauen-Projekt")
@@ -807,6 +2679,13 @@ with tab4:
                 qids = extract_qids_from_list(url)
                 all_qids.update(qids)
 
+            bitsets = get_qid_bitsets()
+            if only_missing_tab4 and bitsets is not None and "de" in bitsets.bits:
+                # QIDs with a dewiki article would be filtered out anyway; skip their lookups
+                candidates = sorted(all_qids)
+                in_de = bitsets.has("de", bitsets.numbers(candidates))
+                all_qids = {qid for qid, exists in zip(candidates, in_de) if not exists}
+
             rows = []
             total = len(all_qids)
             progress = st.progress(0)
@@ -819,11 +2698,7 @@ with tab4:
                         raise ValueError("Keine Sprachversionen")
 
                     sizes = {}
-                    for lang_key, link in sitelinks.items():
-                        if not lang_key.endswith("wiki"):
-                            continue
-                        lang = lang_key.replace("wiki", "")
-                        title = link["title"]
+                    for lang, title in sitelinks.items():
                         rev_url = f"https://{lang}.wikipedia.org/w/api.php"
                         rev_params = {
                             "action": "query",
@@ -848,12 +2723,16 @@ with tab4:
                     max_lang, (_, max_title) = max(sizes.items(), key=lambda x: x[1][0])
 
                     title_for_api = max_title.replace(" ", "_")
-                    views = get_pageviews(title_for_api, lang=max_lang, days=30)
+                    # tab 4 rows have no _lookup follow-up, so a queued retry would never be read
+                    single_info = get_batch_article_info([max_title], lang=max_lang, retry_failed=False).get(max_title, {})
+                    series = single_info.get("daily_views")
+                    if series is None:
+                        series = get_daily_views(title_for_api, lang=max_lang, days=30)
+                    views = sum_views(series)
                     summary = get_summary(title_for_api, lang=max_lang)
                     est_de = int(views * DE_ESTIMATE_FACTOR) if isinstance(views, (int, float)) else None
-                    _, _, cv, _, virality = get_daily_views_stats(title_for_api, lang=max_lang, days=30)
+                    cv, virality = tracked_virality(max_lang, title_for_api, series)
 
-                    single_info = get_batch_article_info([max_title], lang=max_lang).get(max_title, {})
                     de_title = single_info.get("de_title")
                     if de_title:
                         exists_de = "✅"
@@ -866,7 +2745,7 @@ with tab4:
                     query = f'"{max_title}" site:.de'
                     google_url = f"https://www.google.com/search?q={quote_plus(query)}"
 
-                    return {
+                    row = {
                         "Name": f'<a href="{wiki_url}" target="_blank">{max_title}</a>',
                         "CV": cv,
                         "Viralität": virality,
@@ -875,25 +2754,32 @@ with tab4:
                         "Views (30d)": views,
                         "Estimated DE Views": est_de,
                         "Exists in DE": exists_de,
-                        "Summary": summary[:180] + "..." if len(summary) > 180 else summary,
+                        "Summary": summary[:SUMMARY_CHARS] + "..." if len(summary) > SUMMARY_CHARS else summary,
                         "Google": f'<a href="{google_url}" target="_blank">Suchen</a>'
                     }
+                    for target in GAP_LANGS:
+                        if target != "de":
+                            row[f"Exists in {target.upper()}"] = "✅" if target in sitelinks else "❌"
+                    return row
 
                 except Exception:
+                    retry_later = bool(degraded_hosts())
                     return {
                         "Name": qid,
+                        "Erneut prüfen": RETRY_LATER_MARK if retry_later else "",
                         "CV": None,
                         "Viralität": "Fehler",
                         "German Title": "",
                         "Sprache (größte Version)": "",
                         "Views (30d)": None,
                         "Estimated DE Views": None,
-                        "Exists in DE": "❓",
+                        # kept by filter_missing_in_de while marked for a later retry
+                        "Exists in DE": RETRY_LATER_MARK if retry_later else "❓",
                         "Summary": "Fehler",
                         "Google": ""
                     }
 
-            with ThreadPoolExecutor(max_workers=4) as executor:
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
                 futures = {executor.submit(process_qid_robust, qid): qid for qid in all_qids}
                 for i, future in enumerate(as_completed(futures)):
                     rows.append(future.result())
@@ -933,18 +2819,53 @@ with tab5:
                     view_column="Views (30d)",
                     include_summary=True,
                     include_stats=True,
-                    max_workers=4,
                 )
-                results = filter_missing_in_de(results, only_missing_tab5)
-
-            if results:
-                df = pd.DataFrame(results)
-                df = prepare_dataframe_for_sorting(df)
-                df = reorder_columns(df, context="default")
-                df = df.sort_values(by="Views (30d)", ascending=False, na_position="last")
-                st.markdown(df.to_html(escape=False, index=False), unsafe_allow_html=True)
-
-                csv = df.to_csv(index=False).encode("utf-8")
-                st.download_button("CSV herunterladen", data=csv, file_name="eigene_liste_check.csv", mime="text/csv")
-            else:
-                st.info("Keine passenden Artikel gefunden.")
+                st.session_state["tab5_results"] = results
+
+    if "tab5_results" in st.session_state:
+        show_results("tab5_results", only_missing_tab5, "Views (30d)", file_name="eigene_liste_check.csv")
+
+with st.sidebar:
+    st.header("Diagnose")
+    if os.environ.get("K_SERVICE") and "WIKIRADAR_CACHE_DIR" not in os.environ:
+        # K_SERVICE is set by Cloud Run
+        st.caption("HTTP-Cache liegt im flüchtigen Instanz-Speicher (WIKIRADAR_CACHE_DIR nicht gesetzt).")
+    breaker_stats = get_breaker_stats()
+    for host in sorted(degraded_hosts()):
+        st.warning(
+            f"{host} antwortet nicht zuverlässig ({breaker_stats[host]['Status']}). "
+            f"Anfragen werden vorübergehend übersprungen, betroffene Zeilen sind mit {RETRY_LATER_MARK} markiert."
+        )
+    endpoint_stats = get_request_metrics().endpoint_summary()
+    if endpoint_stats:
+        st.subheader("Anfragen je Endpunkt")
+        st.dataframe(pd.DataFrame.from_dict(endpoint_stats, orient="index"))
+        st.subheader("Laufzeit je Stufe")
+        st.dataframe(pd.DataFrame.from_dict(get_request_metrics().stage_summary(), orient="index"))
+    if start_metrics_server() is not None:
+        st.caption(f"Prometheus-Metriken: http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+    if breaker_stats:
+        st.subheader("Circuit-Breaker")
+        st.dataframe(pd.DataFrame.from_dict(breaker_stats, orient="index"))
+    pool_stats = get_pool_stats()
+    st.subheader("HTTP-Verbindungen")
+    if pool_stats:
+        st.dataframe(pd.DataFrame.from_dict(pool_stats, orient="index"))
+    else:
+        st.caption("Noch keine Verbindungen geöffnet.")
+    sitelink_index = get_sitelink_index()
+    if sitelink_index is not None:
+        st.caption(f"Offline-Sitelink-Index: {sitelink_index.describe()}".replace(",", "."))
+    qid_bitsets = get_qid_bitsets()
+    if qid_bitsets is not None:
+        totals = ", ".join(f"{lang}: {views_format(n)}" for lang, n in qid_bitsets.totals.items())
+        st.caption(f"QID-Bitsets (Artikel je Wiki): {totals}")
+    st.caption(f"Laufende View-Statistiken: {views_format(len(get_view_stats_tracker()))} Artikelfenster")
+    spike_tracked = get_spike_detector().tracked()
+    if spike_tracked:
+        tracked = ", ".join(f"{lang}: {views_format(n)}" for lang, n in spike_tracked.items())
+        st.caption(f"Spike-Erkennung (verfolgte Artikel je Wiki): {tracked}")
+    st.subheader("Request-Bündelung")
+    st.dataframe(pd.DataFrame([get_single_flight().stats()]), hide_index=True)
+    st.subheader("Wiederholte Metadaten-Abfragen")
+    st.dataframe(pd.DataFrame([get_lookup_retry_queue().stats]), hide_index=True)
@@ -0,0 +1,489 @@
+import os
+import re
+import bz2
+import gzip
+import json
+import zlib
+import sqlite3
+import functools
+import threading
+import multiprocessing
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import numpy as np
+
+# offline dump tooling shared by the CLI and the app; no Streamlit and no network on import
+
+DATA_DIR = os.environ.get("WIKIRADAR_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data"))
+# one compressed columnar file per wiki and day: <dir>/<lang>/<YYYYMMDD>.npz
+PAGEVIEW_STORE_DIR = os.path.join(DATA_DIR, "pageviews")
+# QID -> {language: title} from the Wikidata entity dump, zlib-compressed JSON per item
+SITELINK_INDEX_PATH = os.path.join(DATA_DIR, "sitelinks.sqlite3")
+# dump lines handed to a worker process at a time
+SITELINK_INGEST_BATCH = 2000
+# one bit per QID and wiki, memory-mapped: <dir>/<lang>.bits plus meta.json
+QID_BITSET_DIR = os.path.join(DATA_DIR, "qid_bits")
+# sitelinks ending in "wiki" that are not language editions of Wikipedia
+NON_LANGUAGE_WIKIS = {
+    "commonswiki", "specieswiki", "metawiki", "mediawikiwiki", "wikidatawiki",
+    "sourceswiki", "incubatorwiki", "outreachwiki", "wikimaniawiki", "wikifunctionswiki",
+}
+
+
+# ---------- SITELINKS ----------
+def wiki_lang(site):
+    # "enwiki" -> "en", "zh_yuewiki" -> "zh-yue"; None for other projects
+    if not site.endswith("wiki") or site in NON_LANGUAGE_WIKIS:
+        return None
+    return site[:-4].replace("_", "-")
+
+
+def compact_sitelinks(sitelinks):
+    langlinks = {}
+    for site, link in sitelinks.items():
+        lang = wiki_lang(site)
+        if lang:
+            langlinks[lang] = link.get("title")
+    return langlinks
+
+
+# ---------- OFFLINE PAGEVIEW DUMPS ----------
+DUMP_DAY_RE = re.compile(r"pageviews-(\d{8})-")
+# hourly dumps are "pageviews-YYYYMMDD-HHMMSS.gz", daily pageview_complete files "pageviews-YYYYMMDD-user.bz2"
+HOURLY_DUMP_RE = re.compile(r"pageviews-\d{8}-(\d{2})\d{4}")
+
+
+def open_dump(path):
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rt", encoding="utf-8", errors="replace")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "rt", encoding="utf-8", errors="replace")
+
+
+def parse_dump_line(line):
+    # hourly:   "en.m Title 12 0"                       (domain code, title, views, bytes)
+    # complete: "en.wikipedia Title 123 mobile-web 12 A5B7"  (wiki, title, page id, access, views, hours)
+    parts = line.split(" ")
+    if len(parts) == 4:
+        domain, title, views = parts[0], parts[1], parts[2]
+        project = domain.split(".")
+        # "en" and "en.m" are Wikipedia, any other suffix is a sister project
+        if len(project) > 2 or (len(project) == 2 and project[1] != "m"):
+            return None
+        wiki = project[0]
+    elif len(parts) == 6:
+        domain, title, views = parts[0], parts[1], parts[4]
+        if not domain.endswith(".wikipedia"):
+            return None
+        wiki = domain[:-len(".wikipedia")]
+    else:
+        return None
+    try:
+        return wiki, title, int(views)
+    except ValueError:
+        return None
+
+
+def partition_path(lang, day, store_dir=PAGEVIEW_STORE_DIR):
+    return os.path.join(store_dir, lang, f"{day}.npz")
+
+
+class PageviewPartition:
+    def __init__(self, blob, offsets, views, sources=()):
+        self.blob = blob
+        self.offsets = offsets
+        self.views = views
+        self.sources = set(sources)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["blob"], data["offsets"], data["views"], data["sources"].tolist())
+
+    @classmethod
+    def from_counts(cls, counts, sources=()):
+        titles = sorted(counts)
+        encoded = [t.encode("utf-8") for t in titles]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        views = np.array([counts[t] for t in titles], dtype=np.int64)
+        return cls(blob, offsets, views, sources)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path[:-len(".npz")] + ".tmp.npz"
+        np.savez_compressed(
+            tmp,
+            blob=self.blob,
+            offsets=self.offsets,
+            views=self.views,
+            sources=np.array(sorted(self.sources), dtype=str),
+        )
+        os.replace(tmp, path)
+
+    @property
+    def complete(self):
+        return sources_complete(self.sources)
+
+    def __len__(self):
+        return len(self.views)
+
+    def title_at(self, i):
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes()
+
+    def counts(self):
+        return {self.title_at(i).decode("utf-8"): int(v) for i, v in enumerate(self.views)}
+
+    def lookup(self, title):
+        # titles are stored in UTF-8 byte order, which matches code point order
+        key = title.encode("utf-8")
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.title_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self) and self.title_at(lo) == key:
+            return int(self.views[lo])
+        return 0
+
+    def top(self, n):
+        n = min(n, len(self))
+        if not n:
+            return []
+        idx = np.argpartition(-self.views, n - 1)[:n]
+        idx = idx[np.argsort(-self.views[idx], kind="stable")]
+        return [(self.title_at(i).decode("utf-8"), int(self.views[i])) for i in idx]
+
+
+def sources_complete(sources):
+    # a whole day: one daily file or all 24 hourly files
+    hours = set()
+    for source in sources:
+        match = HOURLY_DUMP_RE.match(source)
+        if not match:
+            return True
+        hours.add(match.group(1))
+    return len(hours) == 24
+
+
+def partition_complete(path):
+    # reads only the sources array of the archive
+    return sources_complete(partition_sources(path))
+
+
+def partition_sources(path):
+    if not os.path.exists(path):
+        return set()
+    with np.load(path, allow_pickle=False) as data:
+        return set(data["sources"].tolist())
+
+
+def write_day_partitions(pending, sources, day, store_dir, min_views):
+    # merges one day's counts into the stored partitions; returns the number written
+    written = 0
+    for wiki, source_set in sources.items():
+        path = partition_path(wiki, day, store_dir)
+        counts = pending.get(wiki, {})
+        if os.path.exists(path):
+            existing = PageviewPartition.load(path)
+            merged = existing.counts()
+            for title, views in counts.items():
+                merged[title] = merged.get(title, 0) + views
+            counts = merged
+            source_set = source_set | existing.sources
+        counts = {t: v for t, v in counts.items() if v >= min_views}
+        PageviewPartition.from_counts(counts, source_set).save(path)
+        written += 1
+    return written
+
+
+def ingest_pageview_dumps(paths, wikis, store_dir=PAGEVIEW_STORE_DIR, min_views=1):
+    # sums all access methods (and all hours of hourly files) into one partition per wiki and day.
+    # Files are grouped by day and each day is written before the next one is read, so only one
+    # day's titles are held in memory however many days are ingested at once.
+    wikis = set(wikis)
+    summary = {"files": 0, "skipped": 0, "lines": 0, "partitions": 0}
+    by_day = defaultdict(list)
+    for path in paths:
+        match = DUMP_DAY_RE.search(os.path.basename(path))
+        if not match:
+            summary["skipped"] += 1
+            continue
+        by_day[match.group(1)].append(path)
+
+    for day, day_paths in sorted(by_day.items()):
+        pending = defaultdict(lambda: defaultdict(int))
+        sources = defaultdict(set)
+        for path in day_paths:
+            source = os.path.basename(path)
+            # re-ingesting a file must not double its counts
+            targets = {
+                w for w in wikis
+                if source not in sources.get(w, ()) and source not in partition_sources(partition_path(w, day, store_dir))
+            }
+            if not targets:
+                summary["skipped"] += 1
+                continue
+
+            seen = set()
+            with open_dump(path) as fh:
+                for line in fh:
+                    parsed = parse_dump_line(line.rstrip("\n"))
+                    if not parsed or parsed[0] not in targets:
+                        continue
+                    wiki, title, views = parsed
+                    pending[wiki][title] += views
+                    seen.add(wiki)
+                    summary["lines"] += 1
+            # wikis without a single line in this file get no (empty) partition and no source entry
+            for wiki in seen:
+                sources[wiki].add(source)
+            summary["files"] += 1
+
+        summary["partitions"] += write_day_partitions(pending, sources, day, store_dir, min_views)
+
+    return summary
+
+
+# ---------- OFFLINE SITELINK INDEX ----------
+# the top-level "type" and "id" open every entity; a QID anywhere else belongs to a claim
+WD_ITEM_HEAD_RE = re.compile(
+    r'\{\s*(?:"type"\s*:\s*"item"\s*,\s*"id"\s*:\s*"Q(\d+)"|"id"\s*:\s*"Q(\d+)"\s*,\s*"type"\s*:\s*"item")'
+)
+WD_SITELINKS_RE = re.compile(r'"sitelinks"\s*:\s*')
+JSON_DECODER = json.JSONDecoder()
+
+
+def parse_entity_sitelinks(line, wikis=None):
+    # one line of the entity dump ("[", "{...},", "]"); only the sitelinks object is decoded,
+    # the much larger claims are skipped. Returns (numeric QID, {lang: title}) or None for
+    # properties, lexemes and anything else that is not an item.
+    line = line.strip().rstrip(",")
+    match = WD_ITEM_HEAD_RE.match(line)
+    if not match:
+        return None
+    links = WD_SITELINKS_RE.search(line, match.end())
+    sitelinks = {}
+    if links:
+        try:
+            sitelinks, _ = JSON_DECODER.raw_decode(line, links.end())
+        except ValueError:
+            return None
+    langlinks = compact_sitelinks(sitelinks)
+    if wikis is not None:
+        langlinks = {lang: title for lang, title in langlinks.items() if lang in wikis}
+    return int(match.group(1) or match.group(2)), langlinks
+
+
+def parse_sitelink_batch(lines, wikis=None):
+    # runs in the worker processes; items without Wikipedia sitelinks only advance max_qid
+    rows = []
+    max_qid = 0
+    for line in lines:
+        parsed = parse_entity_sitelinks(line, wikis)
+        if not parsed:
+            continue
+        qid, langlinks = parsed
+        max_qid = max(max_qid, qid)
+        if langlinks:
+            payload = json.dumps(langlinks, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            rows.append((qid, zlib.compress(payload)))
+    return rows, max_qid, len(lines)
+
+
+def read_line_batches(paths, size):
+    for path in paths:
+        with open_dump(path) as fh:
+            batch = []
+            for line in fh:
+                batch.append(line)
+                if len(batch) >= size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+
+class SitelinkIndex:
+    # items absent from the index but not newer than the dump's highest QID have no Wikipedia article.
+    # An index ingested with a wiki filter lacks the items without links in those wikis and the links
+    # to all others, so it only feeds the bitsets and never answers lookups.
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS sitelinks (qid INTEGER PRIMARY KEY, links BLOB)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.max_qid = int(self.get_meta("max_qid") or 0)
+        wikis = self.get_meta("wikis")
+        self.wikis = frozenset(wikis.split(",")) if wikis else None
+
+    def get_meta(self, key):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, str(value)))
+
+    def write(self, rows, max_qid=0):
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO sitelinks VALUES (?, ?)", rows)
+        if max_qid > self.max_qid:
+            self.max_qid = max_qid
+            self.set_meta("max_qid", max_qid)
+
+    def lookup(self, qids):
+        # {qid: {lang: title}} for every QID the dump covered; newer items are left out
+        if self.wikis is not None:
+            return {}
+        numbers = {int(q[1:]): q for q in qids if q and q[0] == "Q" and q[1:].isdigit()}
+        result = {q: {} for n, q in numbers.items() if n <= self.max_qid}
+        keys = list(numbers)
+        for i in range(0, len(keys), 500):
+            part = keys[i:i + 500]
+            with self.lock:
+                rows = self.conn.execute(
+                    f"SELECT qid, links FROM sitelinks WHERE qid IN ({','.join('?' * len(part))})", part
+                ).fetchall()
+            for number, blob in rows:
+                result[numbers[number]] = json.loads(zlib.decompress(blob))
+        return result
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM sitelinks").fetchone()[0]
+
+    def describe(self):
+        text = f"{int(self.get_meta('items') or 0):,} Items bis Q{self.max_qid}, Stand {self.get_meta('ingested_at')}"
+        if self.wikis is not None:
+            text += f", nur {'/'.join(sorted(self.wikis))} (nur für Bitsets)"
+        return text
+
+
+def ingest_sitelink_dump(paths, index_path=SITELINK_INDEX_PATH, wikis=None, processes=None):
+    # decompression and line splitting stay in this process, JSON work is spread over worker processes;
+    # without fork (or with processes=1) everything runs in-process
+    wikis = frozenset(wikis) if wikis else None
+    processes = processes or os.cpu_count() or 1
+    index = SitelinkIndex(index_path)
+    if index.max_qid and index.wikis != wikis:
+        # rows of both runs would mix, and the filter in meta would be wrong for one of them
+        raise ValueError(
+            f"Index {index_path} wurde mit anderem --wikis-Filter eingelesen "
+            f"({','.join(sorted(index.wikis)) if index.wikis else 'alle'}); neuen Pfad wählen oder löschen"
+        )
+    index.set_meta("wikis", ",".join(sorted(wikis)) if wikis else "")
+    index.wikis = wikis
+    summary = {"files": len(paths), "lines": 0, "items": 0, "max_qid": index.max_qid}
+    parse = functools.partial(parse_sitelink_batch, wikis=wikis)
+    batches = read_line_batches(paths, SITELINK_INGEST_BATCH)
+
+    def consume(results):
+        for rows, max_qid, lines in results:
+            index.write(rows, max_qid)
+            summary["lines"] += lines
+            summary["items"] += len(rows)
+
+    if processes > 1 and "fork" in multiprocessing.get_all_start_methods():
+        with multiprocessing.get_context("fork").Pool(processes) as pool:
+            consume(pool.imap(parse, batches, chunksize=4))
+    else:
+        consume(map(parse, batches))
+
+    index.set_meta("ingested_at", datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC"))
+    index.set_meta("items", index.count())
+    summary["max_qid"] = index.max_qid
+    return summary
+
+
+# ---------- QID BITSETS ----------
+# bit (qid & 7) of byte (qid >> 3); ~15 MB per wiki for all of Wikidata
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def build_qid_bitsets(langs, index_path=SITELINK_INDEX_PATH, out_dir=QID_BITSET_DIR):
+    # a filtered index only knows its own wikis; bits for any other wiki would all be 0
+    index = SitelinkIndex(index_path)
+    if index.wikis is not None:
+        langs = [lang for lang in langs if lang in index.wikis]
+    size = index.max_qid // 8 + 1
+    os.makedirs(out_dir, exist_ok=True)
+    bits = {lang: np.memmap(os.path.join(out_dir, f"{lang}.bits.tmp"), dtype=np.uint8, mode="w+", shape=(size,))
+            for lang in langs}
+
+    with index.lock:
+        cursor = index.conn.execute("SELECT qid, links FROM sitelinks")
+        while True:
+            rows = cursor.fetchmany(100000)
+            if not rows:
+                break
+            members = defaultdict(list)
+            for qid, blob in rows:
+                for lang in json.loads(zlib.decompress(blob)):
+                    if lang in bits:
+                        members[lang].append(qid)
+            for lang, qids in members.items():
+                qids = np.asarray(qids, dtype=np.int64)
+                np.bitwise_or.at(bits[lang], qids >> 3, (1 << (qids & 7)).astype(np.uint8))
+
+    for lang, array in bits.items():
+        array.flush()
+        os.replace(os.path.join(out_dir, f"{lang}.bits.tmp"), os.path.join(out_dir, f"{lang}.bits"))
+    with open(os.path.join(out_dir, "meta.json"), "w") as fh:
+        json.dump({"max_qid": index.max_qid, "langs": list(langs)}, fh)
+    return {"langs": len(langs), "max_qid": index.max_qid, "bytes_per_lang": size}
+
+
+class QidBitsets:
+    def __init__(self, directory):
+        with open(os.path.join(directory, "meta.json")) as fh:
+            meta = json.load(fh)
+        self.max_qid = meta["max_qid"]
+        self.bits = {
+            lang: np.memmap(os.path.join(directory, f"{lang}.bits"), dtype=np.uint8, mode="r")
+            for lang in meta["langs"]
+        }
+
+    def numbers(self, qids):
+        # "Q42" -> 42; unparseable or newer than the dump -> -1
+        numbers = np.array([int(q[1:]) if q and q[0] == "Q" and q[1:].isdigit() else -1 for q in qids],
+                           dtype=np.int64)
+        numbers[numbers > self.max_qid] = -1
+        return numbers
+
+    def has(self, lang, numbers):
+        # vectorized membership; numbers from numbers(), -1 answers False
+        valid = numbers >= 0
+        safe = np.where(valid, numbers, 0)
+        return valid & ((self.bits[lang][safe >> 3] >> (safe & 7)) & 1).astype(bool)
+
+    def counts(self, numbers):
+        # sitelinks per QID among the indexed wikis: popcount of the per-QID language mask
+        mask = np.zeros(len(numbers), dtype=np.uint16)
+        for i, lang in enumerate(self.bits):
+            mask |= self.has(lang, numbers).astype(np.uint16) << i
+        return POPCOUNT[mask & 0xFF] + POPCOUNT[mask >> 8]
+
+    @functools.cached_property
+    def totals(self):
+        # articles per wiki: popcount over the whole bitset
+        return {lang: int(POPCOUNT[array].sum(dtype=np.int64)) for lang, array in self.bits.items()}
+
+    def langlinks(self, qids):
+        # {qid: {lang: None}}: existence per indexed wiki without titles, for QIDs the dump covered
+        numbers = self.numbers(qids)
+        covered = numbers >= 0
+        present = {lang: self.has(lang, numbers) for lang in self.bits}
+        return {
+            qid: {lang: None for lang in self.bits if present[lang][i]}
+            for i, qid in enumerate(qids) if covered[i]
+        }
@@ -0,0 +1,208 @@
+import os
+
+import pytest
+
+from offline import (
+    PageviewPartition, QidBitsets, SitelinkIndex, build_qid_bitsets, ingest_pageview_dumps, ingest_sitelink_dump,
+    parse_dump_line, parse_entity_sitelinks, partition_complete, partition_path, sources_complete,
+)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+HOUR_0 = os.path.join(FIXTURES, "pageviews-20240101-000000")
+HOUR_1 = os.path.join(FIXTURES, "pageviews-20240101-010000")
+DAILY = os.path.join(FIXTURES, "pageviews-20240102-user")
+ENTITIES = os.path.join(FIXTURES, "wikidata-sample.json")
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("en Main_Page 120 0", ("en", "Main_Page", 120)),
+    ("en.m Main_Page 80 0", ("en", "Main_Page", 80)),
+    ("en.d Word 9 0", None),
+    ("en.m.voy Trip 3 0", None),
+    ("en.wikipedia Main_Page 15580374 mobile-web 1000 A1000", ("en", "Main_Page", 1000)),
+    ("en.wiktionary word 5 desktop 9 A9", None),
+    ("en Main_Page many 0", None),
+    ("garbage line", None),
+])
+def test_parse_dump_line(line, expected):
+    assert parse_dump_line(line) == expected
+
+
+def load(store, lang, day):
+    return PageviewPartition.load(partition_path(lang, day, store))
+
+
+def test_ingest_sums_access_methods(tmp_path):
+    summary = ingest_pageview_dumps([DAILY], ["en", "de"], store_dir=str(tmp_path))
+
+    assert summary["files"] == 1
+    assert load(str(tmp_path), "en", "20240102").counts() == {"Main_Page": 5000, "Alan_Turing": 300}
+    assert load(str(tmp_path), "de", "20240102").counts() == {"Berlin": 50}
+
+
+def test_reingest_merges_without_doubling(tmp_path):
+    store = str(tmp_path)
+    ingest_pageview_dumps([HOUR_0], ["en"], store_dir=store)
+    ingest_pageview_dumps([HOUR_1], ["en"], store_dir=store)
+    summary = ingest_pageview_dumps([HOUR_0, HOUR_1], ["en"], store_dir=store)
+
+    assert summary["files"] == 0
+    assert summary["skipped"] == 2
+    partition = load(store, "en", "20240101")
+    assert partition.counts() == {"Main_Page": 230, "Zürich": 5, "Alan_Turing": 12}
+    assert partition.sources == {os.path.basename(HOUR_0), os.path.basename(HOUR_1)}
+
+
+def test_ingest_writes_each_day_of_one_call(tmp_path, monkeypatch):
+    import offline
+
+    store = str(tmp_path)
+    written = []
+    save = PageviewPartition.save
+
+    def track_save(self, path):
+        written.append((path, len(self)))
+        save(self, path)
+
+    opened = []
+    open_dump = offline.open_dump
+
+    def track_open(path):
+        # the first day is on disk before the second day's file is read
+        opened.append((os.path.basename(path), len(written)))
+        return open_dump(path)
+
+    monkeypatch.setattr(PageviewPartition, "save", track_save)
+    monkeypatch.setattr(offline, "open_dump", track_open)
+    summary = ingest_pageview_dumps([DAILY, HOUR_0, HOUR_1, "notes.txt"], ["en", "de"], store_dir=store)
+
+    assert summary == {"files": 3, "skipped": 1, "lines": 11, "partitions": 4}
+    assert opened == [
+        ("pageviews-20240101-000000", 0), ("pageviews-20240101-010000", 0), ("pageviews-20240102-user", 2),
+    ]
+    assert load(store, "en", "20240101").counts() == {"Main_Page": 230, "Zürich": 5, "Alan_Turing": 12}
+    assert load(store, "de", "20240101").counts() == {"Berlin": 10}
+    assert load(store, "en", "20240102").counts() == {"Main_Page": 5000, "Alan_Turing": 300}
+    assert load(store, "de", "20240102").counts() == {"Berlin": 50}
+
+
+def test_ingest_skips_wikis_without_lines(tmp_path):
+    store = str(tmp_path)
+    summary = ingest_pageview_dumps([HOUR_0], ["en", "fr", "it"], store_dir=store)
+
+    assert summary["partitions"] == 1
+    assert os.listdir(store) == ["en"]
+
+
+def test_hourly_files_complete_a_day_only_all_together(tmp_path):
+    store = str(tmp_path)
+    ingest_pageview_dumps([HOUR_0, HOUR_1], ["en"], store_dir=store)
+    ingest_pageview_dumps([DAILY], ["en"], store_dir=store)
+
+    assert not load(store, "en", "20240101").complete
+    assert not partition_complete(partition_path("en", "20240101", store))
+    assert load(store, "en", "20240102").complete
+    assert partition_complete(partition_path("en", "20240102", store))
+    assert not partition_complete(partition_path("en", "20240103", store))
+
+
+def test_sources_complete():
+    hours = [f"pageviews-20240101-{h:02d}0000.gz" for h in range(24)]
+
+    assert sources_complete(hours)
+    assert not sources_complete(hours[:-1])
+    assert not sources_complete(hours[:-1] + [hours[0].replace(".gz", ".bz2")])
+    assert sources_complete(["pageviews-20240101-user.bz2"])
+    assert not sources_complete([])
+
+
+def test_partition_lookup_and_top():
+    partition = PageviewPartition.from_counts({"Berlin": 7, "Zürich": 5, "Ämter": 9, "Alan_Turing": 12, "A": 1})
+
+    assert partition.lookup("Zürich") == 5
+    assert partition.lookup("Ämter") == 9
+    assert partition.lookup("A") == 1
+    assert partition.lookup("Missing") == 0
+    assert partition.lookup("") == 0
+    assert partition.top(3) == [("Alan_Turing", 12), ("Ämter", 9), ("Berlin", 7)]
+    assert partition.top(10)[-1] == ("A", 1)
+    assert PageviewPartition.from_counts({}).top(5) == []
+
+
+def test_partition_roundtrip(tmp_path):
+    path = str(tmp_path / "en" / "20240101.npz")
+    PageviewPartition.from_counts({"Berlin": 7, "Zürich": 5}, {"a", "b"}).save(path)
+    partition = PageviewPartition.load(path)
+
+    assert partition.counts() == {"Berlin": 7, "Zürich": 5}
+    assert partition.sources == {"a", "b"}
+    assert partition.lookup("Zürich") == 5
+
+
+def entity_lines():
+    with open(ENTITIES, encoding="utf-8") as fh:
+        return fh.readlines()
+
+
+def test_parse_entity_sitelinks_items_only():
+    parsed = [parse_entity_sitelinks(line) for line in entity_lines()]
+
+    assert parsed == [
+        None,
+        (42, {"en": "Douglas Adams", "de": "Douglas Adams"}),
+        None,
+        (64, {"fr": "Berlin", "zh-yue": "柏林"}),
+        (80, {"de": "Tim Berners-Lee"}),
+        None,
+        (100, {}),
+        None,
+    ]
+    assert parse_entity_sitelinks(entity_lines()[1], wikis=frozenset({"de"})) == (42, {"de": "Douglas Adams"})
+
+
+def test_sitelink_index_lookup(tmp_path):
+    path = str(tmp_path / "sitelinks.sqlite3")
+    summary = ingest_sitelink_dump([ENTITIES], index_path=path, processes=1)
+
+    # Q999 and Q888 only occur inside claims
+    assert summary["max_qid"] == 100
+    assert summary["items"] == 3
+    index = SitelinkIndex(path)
+    assert index.wikis is None
+    assert index.lookup(["Q42", "Q100", "Q99", "Q101", "P31", None]) == {
+        "Q42": {"en": "Douglas Adams", "de": "Douglas Adams"},
+        "Q100": {},
+        "Q99": {},
+    }
+
+
+def test_filtered_sitelink_index_only_feeds_bitsets(tmp_path):
+    path = str(tmp_path / "sitelinks.sqlite3")
+    ingest_sitelink_dump([ENTITIES], index_path=path, wikis=["de", "it"], processes=1)
+    index = SitelinkIndex(path)
+
+    assert index.wikis == {"de", "it"}
+    assert index.lookup(["Q42", "Q64"]) == {}
+    with pytest.raises(ValueError):
+        ingest_sitelink_dump([ENTITIES], index_path=path, processes=1)
+    ingest_sitelink_dump([ENTITIES], index_path=path, wikis=["it", "de"], processes=1)
+
+    out_dir = str(tmp_path / "bits")
+    assert build_qid_bitsets(["de", "fr", "en"], index_path=path, out_dir=out_dir)["langs"] == 1
+    bitsets = QidBitsets(out_dir)
+    assert list(bitsets.bits) == ["de"]
+    assert bitsets.langlinks(["Q42", "Q64", "Q80", "Q101"]) == {"Q42": {"de": None}, "Q64": {}, "Q80": {"de": None}}
+
+
+def test_qid_bitsets(tmp_path):
+    path = str(tmp_path / "sitelinks.sqlite3")
+    ingest_sitelink_dump([ENTITIES], index_path=path, processes=1)
+    out_dir = str(tmp_path / "bits")
+    build_qid_bitsets(["en", "de", "fr"], index_path=path, out_dir=out_dir)
+    bitsets = QidBitsets(out_dir)
+
+    numbers = bitsets.numbers(["Q42", "Q64", "Q100", "Q101", "bad"])
+    assert numbers.tolist() == [42, 64, 100, -1, -1]
+    assert bitsets.has("de", numbers).tolist() == [True, False, False, False, False]
+    assert bitsets.counts(numbers).tolist() == [2, 1, 0, 0, 0]
+    assert bitsets.totals == {"en": 1, "de": 2, "fr": 1}
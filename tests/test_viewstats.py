@@ -0,0 +1,114 @@
+import random
+import statistics
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from viewstats import RunningViewStats, ViewStatsTracker, classify_virality, compute_view_stats_frame, window_stats
+
+
+def reference_stats(series):
+    # the per-title statistics-module code the frame replaced
+    values = list(series.values())
+    if not values or sum(values) <= 0:
+        return 0, 0, 0, 0, "Keine Daten"
+    avg = statistics.mean(values)
+    std_dev = statistics.stdev(values) if len(values) > 1 else 0
+    cv = std_dev / avg
+    return round(avg), round(std_dev), round(cv, 2), round(max(values) / avg, 2), classify_virality(cv)
+
+
+def random_series(rng):
+    # gaps in the middle, different lengths and offsets, all-zero and heavy-tailed series
+    start = rng.randrange(5)
+    length = rng.randrange(1, 40)
+    scale = rng.choice([0, 1, 10, 1000])
+    series = {}
+    for day in range(start, start + length):
+        if rng.random() < 0.15:
+            continue
+        series[f"202401{day + 1:02d}"] = int(rng.paretovariate(1.5) * scale)
+    return series
+
+
+def test_frame_matches_statistics_module():
+    rng = random.Random(7)
+    series_by_title = {f"T{i}": random_series(rng) for i in range(2000)}
+    frame = compute_view_stats_frame(series_by_title, windows=())
+
+    for title, series in series_by_title.items():
+        row = frame.loc[title]
+        avg, std_dev, cv, peak_ratio, virality = reference_stats(series)
+        assert row["Viralität"] == virality, title
+        assert row["Views"] == sum(series.values())
+        assert row["Ø Views"] == pytest.approx(avg, abs=1)
+        assert row["Std"] == pytest.approx(std_dev, abs=1)
+        assert row["CV"] == pytest.approx(cv, abs=0.011)
+        assert row["Peak-Ratio"] == pytest.approx(peak_ratio, abs=0.011)
+
+
+def test_windows_only_for_spanned_days():
+    series = {f"202401{d:02d}": (100 if d == 30 else 10) for d in range(1, 31)}
+    frame = compute_view_stats_frame({"A": series, "B": None})
+
+    assert "CV (30d)" in frame.columns
+    assert "CV (90d)" not in frame.columns
+    assert frame.at["A", "Views (7d)"] == 6 * 10 + 100
+    assert frame.at["A", "Views (30d)"] == frame.at["A", "Views"]
+    assert frame.at["A", "CV (7d)"] > frame.at["A", "CV"]
+    assert frame.at["B", "Viralität"] == "Fehler"
+    assert np.isnan(frame.at["B", "CV (7d)"])
+
+
+def test_classify_virality_scalar_and_array():
+    assert classify_virality(1.5) == "🧨 Viral"
+    assert classify_virality(0.1) == "💎 Stable"
+    assert classify_virality(0.5) == "⚖️ Mixed"
+    assert classify_virality(np.array([1.5, 0.5])).tolist() == ["🧨 Viral", "⚖️ Mixed"]
+
+
+def day(n):
+    return (datetime(2024, 1, 1) + timedelta(days=n)).strftime("%Y%m%d")
+
+
+def test_running_stats_match_window_recomputation():
+    rng = random.Random(3)
+    running = RunningViewStats(14)
+    history = []
+    for n in range(120):
+        views = int(rng.paretovariate(1.2) * 50)
+        running.push(day(n), views)
+        history.append(views)
+        _, avg, std, cv, peak_ratio, valid = window_stats(np.array([history[-14:]], dtype=float))
+        assert len(running.values) == min(n + 1, 14)
+        assert running.stats()[:4] == (round(avg[0]), round(std[0]), round(cv[0], 2), round(peak_ratio[0], 2))
+        assert running.stats()[4] == classify_virality(cv[0])
+
+
+def test_running_stats_gaps_count_as_zero_and_long_gaps_reset():
+    running = RunningViewStats(7)
+    running.push(day(0), 10)
+    running.push(day(3), 10)
+    assert [v for _, v in running.values] == [10, 0, 0, 10]
+    running.push(day(2), 99)
+    assert running.total == 20
+    running.push(day(20), 5)
+    assert [v for _, v in running.values] == [5]
+    assert RunningViewStats(7).stats()[-1] == "Keine Daten"
+
+
+def test_tracker_only_pushes_new_days():
+    tracker = ViewStatsTracker()
+    series = {day(n): 10 + n % 3 for n in range(30)}
+    first = tracker.update("en", "A", series, window=30)
+    # older days with other values are ignored, the new day slides the window
+    shifted = {day(n): 999 for n in range(1, 30)}
+    shifted[day(30)] = 10 + 30 % 3
+    second = tracker.update("en", "A", shifted, window=30)
+    expected = compute_view_stats_frame({"A": {day(n): 10 + n % 3 for n in range(1, 31)}}, windows=()).loc["A"]
+
+    assert first[-1] == second[-1] == "💎 Stable"
+    assert second[2] == expected["CV"]
+    assert tracker.update("en", "B", None) == (None, None, None, None, "Fehler")
+    assert len(tracker) == 1
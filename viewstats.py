@@ -0,0 +1,153 @@
+import threading
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# daily-view statistics shared by the app and the tests; no Streamlit and no network on import
+
+# coefficient of variation of daily views above/below which an article counts as viral/stable
+VIRAL_CV = 1.0
+STABLE_CV = 0.3
+# trailing windows (days) that get their own Views/CV/Peak-Ratio columns when the series span them
+STAT_WINDOWS = (7, 14, 30, 90)
+
+
+def classify_virality(cv):
+    # scalar or array of CVs; the one place the labels live
+    labels = np.select([np.asarray(cv) > VIRAL_CV, np.asarray(cv) < STABLE_CV], ["🧨 Viral", "💎 Stable"], "⚖️ Mixed")
+    return labels.item() if labels.ndim == 0 else labels
+
+
+def series_matrix(series_by_title):
+    # titles x days, aligned on the union of all days; days a series does not cover are NaN
+    titles = list(series_by_title)
+    days = sorted(set().union(*(s for s in series_by_title.values() if s)))
+    day_index = {day: i for i, day in enumerate(days)}
+    matrix = np.full((len(titles), len(days)), np.nan)
+    for row, title in enumerate(titles):
+        for day, views in (series_by_title[title] or {}).items():
+            matrix[row, day_index[day]] = views
+    return titles, days, matrix
+
+
+def window_stats(matrix):
+    counts = np.sum(~np.isnan(matrix), axis=1)
+    totals = np.nansum(matrix, axis=1)
+    peaks = np.where(np.isnan(matrix), -np.inf, matrix).max(axis=1, initial=-np.inf)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg = totals / counts
+        squares = np.nansum((matrix - avg[:, None]) ** 2, axis=1)
+        # sample standard deviation, as statistics.stdev
+        std = np.where(counts > 1, np.sqrt(squares / (counts - 1)), 0.0)
+        valid = avg > 0
+        cv = np.where(valid, std / avg, 0.0)
+        peak_ratio = np.where(valid, peaks / avg, 0.0)
+    return totals, np.where(valid, avg, 0.0), np.where(valid, std, 0.0), cv, peak_ratio, valid
+
+
+def compute_view_stats_frame(series_by_title, windows=STAT_WINDOWS):
+    # one pass over the whole matrix, plus one per trailing window the collected days span
+    titles, days, matrix = series_matrix(series_by_title)
+    fetched = np.array([series_by_title[t] is not None for t in titles], dtype=bool)
+    frame = pd.DataFrame(index=pd.Index(titles, name="Title"))
+
+    totals, avg, std, cv, peak_ratio, valid = window_stats(matrix)
+    frame["Views"] = np.where(fetched, totals, np.nan)
+    frame["Ø Views"] = np.where(fetched, np.round(avg), np.nan)
+    frame["Std"] = np.where(fetched, np.round(std), np.nan)
+    frame["CV"] = np.where(fetched, np.round(cv, 2), np.nan)
+    frame["Peak-Ratio"] = np.where(fetched, np.round(peak_ratio, 2), np.nan)
+    frame["Viralität"] = np.where(~fetched, "Fehler", np.where(~valid, "Keine Daten", classify_virality(cv)))
+
+    for window in windows:
+        if window > len(days):
+            continue
+        totals, _, _, cv, peak_ratio, _ = window_stats(matrix[:, -window:])
+        frame[f"Views ({window}d)"] = np.where(fetched, totals, np.nan)
+        frame[f"CV ({window}d)"] = np.where(fetched, np.round(cv, 2), np.nan)
+        frame[f"Peak-Ratio ({window}d)"] = np.where(fetched, np.round(peak_ratio, 2), np.nan)
+    return frame
+
+
+class RunningViewStats:
+    # sliding window over consecutive days: running sums plus a monotonic queue for the peak.
+    # Daily views are integers, so the sums stay exact and never drift like float updates would.
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.peaks = deque()
+        self.last_ordinal = None
+        self.last_day = None
+        self.total = 0
+        self.total_sq = 0
+
+    def _add(self, ordinal, views):
+        self.values.append((ordinal, views))
+        self.total += views
+        self.total_sq += views * views
+        while self.peaks and self.peaks[-1][1] <= views:
+            self.peaks.pop()
+        self.peaks.append((ordinal, views))
+
+    def _drop_oldest(self):
+        ordinal, views = self.values.popleft()
+        self.total -= views
+        self.total_sq -= views * views
+        if self.peaks and self.peaks[0][0] == ordinal:
+            self.peaks.popleft()
+
+    def push(self, day, views):
+        # day: YYYYMMDD; days not newer than the last pushed one are ignored
+        if self.last_day is not None and day <= self.last_day:
+            return
+        ordinal = datetime.strptime(day, "%Y%m%d").toordinal()
+        if self.last_ordinal is not None:
+            if ordinal - self.last_ordinal > self.window:
+                self.__init__(self.window)
+            else:
+                # days in between had no views
+                for missing in range(self.last_ordinal + 1, ordinal):
+                    self._push_ordinal(missing, 0)
+        self._push_ordinal(ordinal, views)
+        self.last_day = day
+
+    def _push_ordinal(self, ordinal, views):
+        self._add(ordinal, views)
+        self.last_ordinal = ordinal
+        while len(self.values) > self.window:
+            self._drop_oldest()
+
+    def stats(self):
+        # (Ø views, std, CV, peak ratio, virality) like compute_view_stats_frame for the same window
+        n = len(self.values)
+        if not n or self.total <= 0:
+            return 0, 0, 0, 0, "Keine Daten"
+        avg = self.total / n
+        std_dev = ((n * self.total_sq - self.total ** 2) / (n * (n - 1))) ** 0.5 if n > 1 else 0
+        cv = std_dev / avg
+        peak_ratio = self.peaks[0][1] / avg
+        return round(avg), round(std_dev), round(cv, 2), round(peak_ratio, 2), classify_virality(cv)
+
+
+class ViewStatsTracker:
+    # per (lang, title, window) running stats; an update only pushes the days after the last one seen
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def update(self, lang, title, series, window=30):
+        if series is None:
+            return None, None, None, None, "Fehler"
+        with self.lock:
+            running = self.stats.get((lang, title, window))
+            if running is None:
+                running = self.stats[(lang, title, window)] = RunningViewStats(window)
+            last_day = running.last_day
+            for day in sorted(d for d in series if last_day is None or d > last_day):
+                running.push(day, series[day])
+            return running.stats()
+
+    def __len__(self):
+        return len(self.stats)